@@ -2,14 +2,20 @@
 API routes for Career Roadmap Generator.
 """
 import logging
-import io
-import uuid
+import secrets
 import time
-from flask import Blueprint, request, jsonify, session
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+import orjson
+from flask import Blueprint, Response, request, jsonify, session, stream_with_context
+from werkzeug.exceptions import RequestEntityTooLarge
 from services.resume_parser import ResumeParser
-from services.ai_service import AIService
+from services.ai_service import get_ai_service, RateLimitExceeded
 from services.roadmap_generator import RoadmapGenerator
 from utils.file_handler import FileHandler
+from utils.session_store import ShardedSessionStore, ChatHistory
 
 logger = logging.getLogger(__name__)
 
@@ -17,13 +23,81 @@ api_bp = Blueprint('api', __name__)
 
 # Initialize services
 resume_parser = ResumeParser()
-ai_service = AIService()
+ai_service = get_ai_service()
 roadmap_generator = RoadmapGenerator()
 file_handler = FileHandler()
 
 # In-memory storage for parsed resumes (session-based in production)
-# Using a simple dict keyed by session ID
-resume_storage = {}
+# Sharded by session ID so concurrent requests only contend per shard,
+# and bounded so idle sessions are evicted instead of leaking memory
+resume_store = ShardedSessionStore(maxsize=1024)
+
+# Largest multipart body accepted by upload-resume (5MB file + form overhead)
+MAX_UPLOAD_BYTES = FileHandler.MAX_FILE_SIZE + 1024 * 1024
+
+# Largest JSON body accepted by the AI endpoints (resume text is capped at 50,000 characters)
+MAX_JSON_BYTES = 256 * 1024
+
+def static_error(message, error, status):
+    """Pre-serialize a constant error envelope as (body bytes, status)."""
+    body = orjson.dumps({
+        'success': False,
+        'message': message,
+        'error': error
+    })
+    return body, status
+
+def error_response(static):
+    """Build a fresh response from a pre-serialized error envelope."""
+    body, status = static
+    return Response(body, status=status, mimetype='application/json')
+
+# Static error envelopes, serialized once at import instead of on every request
+ERR_MISSING_FILE = static_error('No file provided. Please upload a resume file.', 'MISSING_FILE', 400)
+ERR_EMPTY_FILENAME = static_error('No file selected. Please choose a file to upload.', 'EMPTY_FILENAME', 400)
+ERR_INVALID_FILE_TYPE = static_error('Invalid file type. Allowed types: PDF, DOCX, TXT', 'INVALID_FILE_TYPE', 400)
+ERR_PARSE_FAILED = static_error('Failed to parse resume file. Please ensure the file is not corrupted.', 'PARSE_ERROR', 500)
+ERR_UPLOAD_TOO_LARGE = static_error('File size exceeds maximum allowed size (5MB)', 'FILE_SIZE_ERROR', 413)
+ERR_UPLOAD_INTERNAL = static_error('An unexpected error occurred. Please try again.', 'INTERNAL_ERROR', 500)
+ERR_PAYLOAD_TOO_LARGE = static_error(f'Request body is too large (max {MAX_JSON_BYTES // 1024}KB)', 'PAYLOAD_TOO_LARGE', 413)
+ERR_INVALID_FORMAT = static_error('Request must be JSON format', 'INVALID_FORMAT', 400)
+ERR_MISSING_RESUME_TEXT = static_error('Missing required field: resume_text', 'MISSING_FIELD', 400)
+ERR_EMPTY_TEXT = static_error('resume_text cannot be empty', 'EMPTY_TEXT', 400)
+ERR_TEXT_TOO_LONG = static_error('Resume text is too long (max 50,000 characters)', 'TEXT_TOO_LONG', 400)
+ERR_ANALYSIS_TIMEOUT = static_error('Analysis timed out. Please try again.', 'TIMEOUT_ERROR', 504)
+ERR_ANALYSIS_INTERNAL = static_error('An unexpected error occurred during analysis.', 'INTERNAL_ERROR', 500)
+ERR_MISSING_PROFILE = static_error('Missing required field: profile', 'MISSING_FIELD', 400)
+ERR_INVALID_PROFILE = static_error('profile must be an object', 'INVALID_PROFILE', 400)
+ERR_RECOMMENDATION_TIMEOUT = static_error('Recommendation timed out. Please try again.', 'TIMEOUT_ERROR', 504)
+ERR_RECOMMENDATION_INTERNAL = static_error('An unexpected error occurred during recommendation.', 'INTERNAL_ERROR', 500)
+ERR_INVALID_TOOLS = static_error('selected_tools must be a non-empty array', 'INVALID_TOOLS', 400)
+ERR_INVALID_HOURS = static_error('hours_per_week must be a positive number', 'INVALID_HOURS', 400)
+ERR_ROADMAP_TIMEOUT = static_error('Roadmap generation timed out. This can take 10-20 seconds. Please try again.', 'TIMEOUT_ERROR', 504)
+ERR_ROADMAP_INTERNAL = static_error('An unexpected error occurred during roadmap generation.', 'INTERNAL_ERROR', 500)
+ERR_MISSING_MESSAGE = static_error('Missing required field: message', 'MISSING_FIELD', 400)
+ERR_EMPTY_MESSAGE = static_error('message cannot be empty', 'EMPTY_MESSAGE', 400)
+ERR_CHAT_TIMEOUT = static_error('Chat timed out. Please try again.', 'TIMEOUT_ERROR', 504)
+ERR_CHAT_INTERNAL = static_error('An unexpected error occurred during chat.', 'INTERNAL_ERROR', 500)
+
+def json_body_too_large():
+    """Check the declared body size so oversized JSON is rejected before parsing."""
+    return request.content_length is not None and request.content_length > MAX_JSON_BYTES
+
+def rate_limit_response(error):
+    """Build a 503 response telling the client when to retry a rate-limited call."""
+    response = jsonify({
+        'success': False,
+        'message': str(error),
+        'error': 'RATE_LIMITED'
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+def sse_event(payload, event=None):
+    """Encode a payload as a Server-Sent Events message."""
+    prefix = f'event: {event}\n'.encode() if event else b''
+    return prefix + b'data: ' + orjson.dumps(payload) + b'\n\n'
 
 def get_session_id():
     """Get or create session ID."""
@@ -34,8 +108,8 @@ def get_session_id():
 def get_stored_resume(session_id=None):
     """Get stored resume data for session."""
     sid = session_id or get_session_id()
-    if sid and sid in resume_storage:
-        return resume_storage[sid]
+    if sid:
+        return resume_store.get(sid)
     return None
 
 @api_bp.route('/upload-resume', methods=['POST'])
@@ -60,14 +134,15 @@ def upload_resume():
     try:
         logger.info("Received resume upload request")
         
+        # Reject oversized uploads from the declared length, before parsing the form
+        if request.content_length is not None and request.content_length > MAX_UPLOAD_BYTES:
+            logger.warning("Upload rejected: body of %s bytes", request.content_length)
+            return error_response(ERR_UPLOAD_TOO_LARGE)
+        
         # Check if file is present in request
         if 'file' not in request.files:
             logger.warning("No file in request")
-            return jsonify({
-                'success': False,
-                'message': 'No file provided. Please upload a resume file.',
-                'error': 'MISSING_FILE'
-            }), 400
+            return error_response(ERR_MISSING_FILE)
         
         file = request.files['file']
         filename = file.filename
@@ -75,40 +150,23 @@ def upload_resume():
         # Check if filename is provided
         if not filename or filename == '':
             logger.warning("Empty filename in request")
-            return jsonify({
-                'success': False,
-                'message': 'No file selected. Please choose a file to upload.',
-                'error': 'EMPTY_FILENAME'
-            }), 400
+            return error_response(ERR_EMPTY_FILENAME)
         
-        logger.info(f"Processing file: {filename}")
+        logger.info("Processing file: %s", filename)
         
         # Validate file type
         if not file_handler.allowed_file(filename):
-            logger.warning(f"Invalid file type: {filename}")
-            return jsonify({
-                'success': False,
-                'message': f'Invalid file type. Allowed types: PDF, DOCX, TXT',
-                'error': 'INVALID_FILE_TYPE'
-            }), 400
+            logger.warning("Invalid file type: %s", filename)
+            return error_response(ERR_INVALID_FILE_TYPE)
         
-        # Read file into memory
-        try:
-            file_content = file.read()
-            file_stream = io.BytesIO(file_content)
-        except Exception as e:
-            logger.error(f"Error reading file: {str(e)}")
-            return jsonify({
-                'success': False,
-                'message': 'Failed to read file. File may be corrupted.',
-                'error': 'FILE_READ_ERROR'
-            }), 400
+        # Parse straight from Werkzeug's spooled upload stream (no extra copy)
+        file_stream = file.stream
         
         # Validate file size
         try:
             file_handler.validate_file_size(file_stream)
         except ValueError as e:
-            logger.warning(f"File size validation failed: {str(e)}")
+            logger.warning("File size validation failed: %s", e)
             return jsonify({
                 'success': False,
                 'message': str(e),
@@ -118,32 +176,28 @@ def upload_resume():
         # Parse resume
         try:
             parsed_data = resume_parser.parse_resume(file_stream, filename)
-            logger.info(f"Resume parsed successfully: {filename}, Word count: {parsed_data['word_count']}")
+            logger.info("Resume parsed successfully: %s, Word count: %s", filename, parsed_data['word_count'])
         except ValueError as e:
-            logger.error(f"Resume parsing failed: {str(e)}")
+            logger.error("Resume parsing failed: %s", e)
             return jsonify({
                 'success': False,
                 'message': str(e),
                 'error': 'PARSE_ERROR'
             }), 400
         except Exception as e:
-            logger.error(f"Unexpected error during parsing: {str(e)}")
-            return jsonify({
-                'success': False,
-                'message': 'Failed to parse resume file. Please ensure the file is not corrupted.',
-                'error': 'PARSE_ERROR'
-            }), 500
+            logger.error("Unexpected error during parsing: %s", e)
+            return error_response(ERR_PARSE_FAILED)
         
         # Store parsed data in-memory (using session ID if available, otherwise use a simple key)
         session_id = get_session_id()
         if not session_id:
             # Generate a simple session ID for in-memory storage
-            session_id = str(uuid.uuid4())
+            session_id = secrets.token_urlsafe(16)
             if hasattr(session, '__setitem__'):
                 session['session_id'] = session_id
         
-        resume_storage[session_id] = parsed_data
-        logger.info(f"Resume data stored for session: {session_id}")
+        resume_store.set(session_id, parsed_data)
+        logger.info("Resume data stored for session: %s", session_id)
         
         # Return success response
         return jsonify({
@@ -157,13 +211,12 @@ def upload_resume():
             'message': 'Resume uploaded successfully'
         }), 200
         
+    except RequestEntityTooLarge:
+        logger.warning("Upload rejected: request body exceeds MAX_CONTENT_LENGTH")
+        return error_response(ERR_UPLOAD_TOO_LARGE)
     except Exception as e:
-        logger.error(f"Unexpected error in upload_resume: {str(e)}", exc_info=True)
-        return jsonify({
-            'success': False,
-            'message': 'An unexpected error occurred. Please try again.',
-            'error': 'INTERNAL_ERROR'
-        }), 500
+        logger.error("Unexpected error in upload_resume: %s", e, exc_info=True)
+        return error_response(ERR_UPLOAD_INTERNAL)
 
 @api_bp.route('/analyze-resume', methods=['POST'])
 def analyze_resume():
@@ -175,77 +228,113 @@ def analyze_resume():
     try:
         logger.info("Received resume analysis request")
         
+        # Reject oversized bodies before paying to parse them
+        if json_body_too_large():
+            return error_response(ERR_PAYLOAD_TOO_LARGE)
+        
         # Get JSON data from request
         if not request.is_json:
-            return jsonify({
-                'success': False,
-                'message': 'Request must be JSON format',
-                'error': 'INVALID_FORMAT'
-            }), 400
+            return error_response(ERR_INVALID_FORMAT)
         
         data = request.get_json()
         
         # Validate resume_text is present
         if 'resume_text' not in data:
-            return jsonify({
-                'success': False,
-                'message': 'Missing required field: resume_text',
-                'error': 'MISSING_FIELD'
-            }), 400
+            return error_response(ERR_MISSING_RESUME_TEXT)
         
         resume_text = data['resume_text']
         
         # Validate text is not empty
         if not resume_text or not resume_text.strip():
-            return jsonify({
-                'success': False,
-                'message': 'resume_text cannot be empty',
-                'error': 'EMPTY_TEXT'
-            }), 400
+            return error_response(ERR_EMPTY_TEXT)
         
         # Check text length (reasonable limit)
         if len(resume_text) > 50000:  # 50KB limit
-            return jsonify({
-                'success': False,
-                'message': 'Resume text is too long (max 50,000 characters)',
-                'error': 'TEXT_TOO_LONG'
-            }), 400
+            return error_response(ERR_TEXT_TOO_LONG)
         
-        logger.info(f"Analyzing resume text ({len(resume_text)} characters)")
+        logger.info("Analyzing resume text (%s characters)", len(resume_text))
         
         # Call AI service to analyze resume
         try:
+            # Repeat submissions are served from the AI service's response cache
             profile = ai_service.analyze_resume(resume_text)
-            logger.info("Resume analysis completed successfully")
+            if profile.get('degraded'):
+                logger.warning("Resume analysis degraded to offline skill extraction")
+            else:
+                logger.info("Resume analysis completed successfully")
+                
+                # Recommendations are the next step; start them while the user reviews the profile
+                ai_service.prefetch_domain_recommendations(profile)
+            
+            message = 'Resume analyzed successfully'
+            if profile.get('degraded'):
+                message = 'AI analysis is temporarily unavailable; showing skills detected in your resume'
             
             return jsonify({
                 'success': True,
                 'profile': profile,
-                'message': 'Resume analyzed successfully'
+                'message': message
             }), 200
             
+        except RateLimitExceeded as e:
+            logger.warning("AI analysis rate limited: %s", e)
+            return rate_limit_response(e)
         except ValueError as e:
-            logger.error(f"AI analysis error: {str(e)}")
+            logger.error("AI analysis error: %s", e)
             return jsonify({
                 'success': False,
                 'message': f'Analysis failed: {str(e)}',
                 'error': 'ANALYSIS_ERROR'
             }), 400
         except TimeoutError as e:
-            logger.error(f"AI analysis timeout: {str(e)}")
-            return jsonify({
-                'success': False,
-                'message': 'Analysis timed out. Please try again.',
-                'error': 'TIMEOUT_ERROR'
-            }), 504
+            logger.error("AI analysis timeout: %s", e)
+            return error_response(ERR_ANALYSIS_TIMEOUT)
         
     except Exception as e:
-        logger.error(f"Unexpected error in analyze_resume: {str(e)}", exc_info=True)
-        return jsonify({
-            'success': False,
-            'message': 'An unexpected error occurred during analysis.',
-            'error': 'INTERNAL_ERROR'
-        }), 500
+        logger.error("Unexpected error in analyze_resume: %s", e, exc_info=True)
+        return error_response(ERR_ANALYSIS_INTERNAL)
+
+def parse_profile_request():
+    """
+    Validate a domain recommendation request body.
+    
+    Returns:
+        Response for an invalid request, otherwise the profile dict with
+        missing required fields filled in
+    """
+    # Reject oversized bodies before paying to parse them
+    if json_body_too_large():
+        return error_response(ERR_PAYLOAD_TOO_LARGE)
+    
+    # Get JSON data from request
+    if not request.is_json:
+        return error_response(ERR_INVALID_FORMAT)
+    
+    data = request.get_json()
+    
+    # Validate profile is present
+    if 'profile' not in data:
+        return error_response(ERR_MISSING_PROFILE)
+    
+    profile = data['profile']
+    
+    # Validate profile structure
+    if not isinstance(profile, dict):
+        return error_response(ERR_INVALID_PROFILE)
+    
+    # Ensure required profile fields exist (with defaults)
+    required_fields = ['skills', 'experience_level', 'years_of_experience', 'domains']
+    for field in required_fields:
+        if field not in profile:
+            logger.warning("Missing profile field: %s, using default", field)
+            if field in ['skills', 'domains']:
+                profile[field] = []
+            elif field == 'years_of_experience':
+                profile[field] = 0
+            else:
+                profile[field] = 'Unknown'
+    
+    return profile
 
 @api_bp.route('/recommend-domains', methods=['POST'])
 def recommend_domains():
@@ -257,47 +346,11 @@ def recommend_domains():
     try:
         logger.info("Received domain recommendation request")
         
-        # Get JSON data from request
-        if not request.is_json:
-            return jsonify({
-                'success': False,
-                'message': 'Request must be JSON format',
-                'error': 'INVALID_FORMAT'
-            }), 400
-        
-        data = request.get_json()
-        
-        # Validate profile is present
-        if 'profile' not in data:
-            return jsonify({
-                'success': False,
-                'message': 'Missing required field: profile',
-                'error': 'MISSING_FIELD'
-            }), 400
-        
-        profile = data['profile']
-        
-        # Validate profile structure
-        if not isinstance(profile, dict):
-            return jsonify({
-                'success': False,
-                'message': 'profile must be an object',
-                'error': 'INVALID_PROFILE'
-            }), 400
-        
-        # Ensure required profile fields exist (with defaults)
-        required_fields = ['skills', 'experience_level', 'years_of_experience', 'domains']
-        for field in required_fields:
-            if field not in profile:
-                logger.warning(f"Missing profile field: {field}, using default")
-                if field in ['skills', 'domains']:
-                    profile[field] = []
-                elif field == 'years_of_experience':
-                    profile[field] = 0
-                else:
-                    profile[field] = 'Unknown'
+        profile = parse_profile_request()
+        if isinstance(profile, Response):
+            return profile
         
-        logger.info(f"Generating recommendations for profile: {profile.get('experience_level', 'Unknown')} level")
+        logger.info("Generating recommendations for profile: %s level", profile.get('experience_level', 'Unknown'))
         
         # Call AI service to recommend domains
         try:
@@ -310,28 +363,146 @@ def recommend_domains():
                 'message': 'Domain recommendations generated successfully'
             }), 200
             
+        except RateLimitExceeded as e:
+            logger.warning("Domain recommendation rate limited: %s", e)
+            return rate_limit_response(e)
         except ValueError as e:
-            logger.error(f"Domain recommendation error: {str(e)}")
+            logger.error("Domain recommendation error: %s", e)
             return jsonify({
                 'success': False,
                 'message': f'Recommendation failed: {str(e)}',
                 'error': 'RECOMMENDATION_ERROR'
             }), 400
         except TimeoutError as e:
-            logger.error(f"Domain recommendation timeout: {str(e)}")
-            return jsonify({
-                'success': False,
-                'message': 'Recommendation timed out. Please try again.',
-                'error': 'TIMEOUT_ERROR'
-            }), 504
+            logger.error("Domain recommendation timeout: %s", e)
+            return error_response(ERR_RECOMMENDATION_TIMEOUT)
         
     except Exception as e:
-        logger.error(f"Unexpected error in recommend_domains: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in recommend_domains: %s", e, exc_info=True)
+        return error_response(ERR_RECOMMENDATION_INTERNAL)
+
+@api_bp.route('/recommend-domains/stream', methods=['POST'])
+def recommend_domains_stream():
+    """
+    Streaming domain recommendations using Server-Sent Events.
+    Accepts: JSON with profile data
+    Returns: text/event-stream of `data: {"recommendation": {...}}` messages as each
+    one is generated, followed by a `done` event with the full list or an `error` event
+    """
+    try:
+        logger.info("Received streaming domain recommendation request")
+        
+        profile = parse_profile_request()
+        if isinstance(profile, Response):
+            return profile
+        
+        def generate():
+            # Cached recommendations are replayed by the service as a stream
+            items = []
+            try:
+                for item in ai_service.stream_domain_recommendations(profile):
+                    items.append(item)
+                    yield sse_event({'recommendation': item})
+            except RateLimitExceeded as e:
+                logger.warning("Domain recommendation stream rate limited: %s", e)
+                yield sse_event({'message': str(e), 'error': 'RATE_LIMITED', 'retry_after': e.retry_after}, event='error')
+                return
+            except TimeoutError as e:
+                logger.error("Domain recommendation stream timeout: %s", e)
+                yield sse_event({'message': 'Recommendation timed out. Please try again.', 'error': 'TIMEOUT_ERROR'}, event='error')
+                return
+            except ValueError as e:
+                logger.error("Domain recommendation stream error: %s", e)
+                yield sse_event({'message': f'Recommendation failed: {str(e)}', 'error': 'RECOMMENDATION_ERROR'}, event='error')
+                return
+            except Exception as e:
+                logger.error("Unexpected error in domain recommendation stream: %s", e, exc_info=True)
+                yield sse_event({'message': 'An unexpected error occurred during recommendation.', 'error': 'INTERNAL_ERROR'}, event='error')
+                return
+            
+            logger.info("Streaming domain recommendations completed")
+            yield sse_event({'recommendations': items}, event='done')
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+        
+    except Exception as e:
+        logger.error("Unexpected error in recommend_domains_stream: %s", e, exc_info=True)
+        return error_response(ERR_RECOMMENDATION_INTERNAL)
+
+def parse_roadmap_request():
+    """
+    Validate a roadmap generation request body.
+    
+    Returns:
+        Response for an invalid request, otherwise the user data dict for
+        the AI service
+    """
+    # Reject oversized bodies before paying to parse them
+    if json_body_too_large():
+        return error_response(ERR_PAYLOAD_TOO_LARGE)
+    
+    # Get JSON data from request
+    if not request.is_json:
+        return error_response(ERR_INVALID_FORMAT)
+    
+    data = request.get_json()
+    
+    # Validate all required fields
+    required_fields = ['profile', 'selected_tools', 'hours_per_week']
+    missing_fields = [field for field in required_fields if field not in data]
+    
+    if missing_fields:
         return jsonify({
             'success': False,
-            'message': 'An unexpected error occurred during recommendation.',
-            'error': 'INTERNAL_ERROR'
-        }), 500
+            'message': f'Missing required fields: {", ".join(missing_fields)}',
+            'error': 'MISSING_FIELDS'
+        }), 400
+    
+    # Extract and validate fields
+    profile = data['profile']
+    selected_tools = data['selected_tools']
+    hours_per_week = data['hours_per_week']
+    learning_style = data.get('learning_style', 'Balanced')
+    deadline = data.get('deadline', 'Flexible')
+    
+    # Validate types and values
+    if not isinstance(profile, dict):
+        return error_response(ERR_INVALID_PROFILE)
+    
+    if not isinstance(selected_tools, list) or len(selected_tools) == 0:
+        return error_response(ERR_INVALID_TOOLS)
+    
+    if not isinstance(hours_per_week, (int, float)) or hours_per_week <= 0:
+        return error_response(ERR_INVALID_HOURS)
+    
+    logger.info("Generating roadmap: %s tools, %s hrs/week", len(selected_tools), hours_per_week)
+    
+    # Prepare user data for AI service
+    return {
+        'profile': profile,
+        'selected_tools': selected_tools,
+        'hours_per_week': hours_per_week,
+        'learning_style': learning_style,
+        'deadline': deadline
+    }
+
+def add_completion_date(roadmap):
+    """
+    Calculate the estimated completion date if the roadmap doesn't provide one.
+    
+    Returns a copy when a date is added, so a roadmap shared through the
+    service's caches is never modified.
+    """
+    if 'estimated_completion_date' not in roadmap and 'total_duration_weeks' in roadmap:
+        weeks = roadmap.get('total_duration_weeks', 0)
+        if weeks > 0:
+            completion_date = datetime.now() + timedelta(weeks=weeks)
+            return dict(roadmap, estimated_completion_date=completion_date.strftime('%Y-%m-%d'))
+    return roadmap
 
 @api_bp.route('/generate-roadmap', methods=['POST'])
 def generate_roadmap():
@@ -343,111 +514,143 @@ def generate_roadmap():
     try:
         logger.info("Received roadmap generation request")
         
-        # Get JSON data from request
-        if not request.is_json:
-            return jsonify({
-                'success': False,
-                'message': 'Request must be JSON format',
-                'error': 'INVALID_FORMAT'
-            }), 400
-        
-        data = request.get_json()
-        
-        # Validate all required fields
-        required_fields = ['profile', 'selected_tools', 'hours_per_week']
-        missing_fields = [field for field in required_fields if field not in data]
-        
-        if missing_fields:
-            return jsonify({
-                'success': False,
-                'message': f'Missing required fields: {", ".join(missing_fields)}',
-                'error': 'MISSING_FIELDS'
-            }), 400
-        
-        # Extract and validate fields
-        profile = data['profile']
-        selected_tools = data['selected_tools']
-        hours_per_week = data['hours_per_week']
-        learning_style = data.get('learning_style', 'Balanced')
-        deadline = data.get('deadline', 'Flexible')
-        
-        # Validate types and values
-        if not isinstance(profile, dict):
-            return jsonify({
-                'success': False,
-                'message': 'profile must be an object',
-                'error': 'INVALID_PROFILE'
-            }), 400
-        
-        if not isinstance(selected_tools, list) or len(selected_tools) == 0:
-            return jsonify({
-                'success': False,
-                'message': 'selected_tools must be a non-empty array',
-                'error': 'INVALID_TOOLS'
-            }), 400
-        
-        if not isinstance(hours_per_week, (int, float)) or hours_per_week <= 0:
-            return jsonify({
-                'success': False,
-                'message': 'hours_per_week must be a positive number',
-                'error': 'INVALID_HOURS'
-            }), 400
-        
-        logger.info(f"Generating roadmap: {len(selected_tools)} tools, {hours_per_week} hrs/week")
-        
-        # Prepare user data for AI service
-        user_data = {
-            'profile': profile,
-            'selected_tools': selected_tools,
-            'hours_per_week': hours_per_week,
-            'learning_style': learning_style,
-            'deadline': deadline
-        }
+        user_data = parse_roadmap_request()
+        if not isinstance(user_data, dict):
+            return user_data
         
         # Call AI service to generate roadmap
         try:
-            roadmap = ai_service.generate_roadmap(user_data)
+            roadmap = add_completion_date(ai_service.generate_roadmap(user_data))
             logger.info("Roadmap generation completed successfully")
             
-            # Calculate estimated completion date if not provided
-            if 'estimated_completion_date' not in roadmap and 'total_duration_weeks' in roadmap:
-                from datetime import datetime, timedelta
-                weeks = roadmap.get('total_duration_weeks', 0)
-                if weeks > 0:
-                    completion_date = datetime.now() + timedelta(weeks=weeks)
-                    roadmap['estimated_completion_date'] = completion_date.strftime('%Y-%m-%d')
-            
             return jsonify({
                 'success': True,
                 'roadmap': roadmap,
                 'message': 'Roadmap generated successfully'
             }), 200
             
+        except RateLimitExceeded as e:
+            logger.warning("Roadmap generation rate limited: %s", e)
+            return rate_limit_response(e)
         except ValueError as e:
-            logger.error(f"Roadmap generation error: {str(e)}")
+            logger.error("Roadmap generation error: %s", e)
             return jsonify({
                 'success': False,
                 'message': f'Roadmap generation failed: {str(e)}',
                 'error': 'ROADMAP_ERROR'
             }), 400
         except TimeoutError as e:
-            logger.error(f"Roadmap generation timeout: {str(e)}")
-            return jsonify({
-                'success': False,
-                'message': 'Roadmap generation timed out. This can take 10-20 seconds. Please try again.',
-                'error': 'TIMEOUT_ERROR'
-            }), 504
+            logger.error("Roadmap generation timeout: %s", e)
+            return error_response(ERR_ROADMAP_TIMEOUT)
         
     except Exception as e:
-        logger.error(f"Unexpected error in generate_roadmap: {str(e)}", exc_info=True)
-        return jsonify({
-            'success': False,
-            'message': 'An unexpected error occurred during roadmap generation.',
-            'error': 'INTERNAL_ERROR'
-        }), 500
+        logger.error("Unexpected error in generate_roadmap: %s", e, exc_info=True)
+        return error_response(ERR_ROADMAP_INTERNAL)
+
+@api_bp.route('/generate-roadmap/stream', methods=['POST'])
+def generate_roadmap_stream():
+    """
+    Streaming roadmap generation using Server-Sent Events.
+    Accepts: Complete user data (profile, selected_tools, preferences)
+    Returns: text/event-stream of `data: {"section": {...}}` messages as each roadmap
+    section is generated, followed by a `done` event with the full roadmap or an `error` event
+    """
+    try:
+        logger.info("Received streaming roadmap generation request")
+        
+        user_data = parse_roadmap_request()
+        if not isinstance(user_data, dict):
+            return user_data
+        
+        def generate():
+            try:
+                for kind, payload in ai_service.stream_roadmap(user_data):
+                    if kind == 'section':
+                        yield sse_event({'section': payload})
+                    else:
+                        roadmap = add_completion_date(payload)
+            except RateLimitExceeded as e:
+                logger.warning("Roadmap stream rate limited: %s", e)
+                yield sse_event({'message': str(e), 'error': 'RATE_LIMITED', 'retry_after': e.retry_after}, event='error')
+                return
+            except TimeoutError as e:
+                logger.error("Roadmap stream timeout: %s", e)
+                yield sse_event({'message': 'Roadmap generation timed out. Please try again.', 'error': 'TIMEOUT_ERROR'}, event='error')
+                return
+            except ValueError as e:
+                logger.error("Roadmap stream error: %s", e)
+                yield sse_event({'message': f'Roadmap generation failed: {str(e)}', 'error': 'ROADMAP_ERROR'}, event='error')
+                return
+            except Exception as e:
+                logger.error("Unexpected error in roadmap stream: %s", e, exc_info=True)
+                yield sse_event({'message': 'An unexpected error occurred during roadmap generation.', 'error': 'INTERNAL_ERROR'}, event='error')
+                return
+            
+            logger.info("Streaming roadmap generation completed")
+            yield sse_event({'roadmap': roadmap}, event='done')
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+        
+    except Exception as e:
+        logger.error("Unexpected error in generate_roadmap_stream: %s", e, exc_info=True)
+        return error_response(ERR_ROADMAP_INTERNAL)
 
-# In-memory conversation history storage
-conversation_history = {}
+# In-memory conversation history storage (bounded, least recently used evicted)
+history_store = ShardedSessionStore(maxsize=4096)
+EMPTY_HISTORY = ChatHistory(maxlen=0)
+
+def parse_chat_request():
+    """
+    Validate a chat request body and build the AI context for it.
+    
+    Returns:
+        Response for an invalid request, otherwise a
+        (message, session_id, chat_context) tuple
+    """
+    # Reject oversized bodies before paying to parse them
+    if json_body_too_large():
+        return error_response(ERR_PAYLOAD_TOO_LARGE)
+    
+    # Get JSON data from request
+    if not request.is_json:
+        return error_response(ERR_INVALID_FORMAT)
+    
+    data = request.get_json()
+    
+    # Validate message is present
+    if 'message' not in data:
+        return error_response(ERR_MISSING_MESSAGE)
+    
+    message = data['message']
+    context = data.get('context', {})
+    
+    # Validate message is not empty
+    if not message or not message.strip():
+        return error_response(ERR_EMPTY_MESSAGE)
+    
+    # Get or create session ID for conversation history
+    session_id = get_session_id()
+    if not session_id:
+        session_id = secrets.token_urlsafe(16)
+        if hasattr(session, '__setitem__'):
+            session['session_id'] = session_id
+    
+    # Prepare context with history
+    chat_context = {
+        'profile': context.get('profile', {}),
+        'roadmap_summary': context.get('roadmap_summary', ''),
+        'history': history_store.get(session_id, EMPTY_HISTORY).recent(5)  # Last 5 exchanges
+    }
+    
+    return message, session_id, chat_context
+
+def record_chat_exchange(session_id, message, response_text):
+    """Append a completed exchange to the session's history (last 20 kept)."""
+    history_store.get_or_create(session_id, ChatHistory).add(message, response_text)
 
 @api_bp.route('/chat', methods=['POST'])
 def chat():
@@ -459,68 +662,19 @@ def chat():
     try:
         logger.info("Received chat request")
         
-        # Get JSON data from request
-        if not request.is_json:
-            return jsonify({
-                'success': False,
-                'message': 'Request must be JSON format',
-                'error': 'INVALID_FORMAT'
-            }), 400
-        
-        data = request.get_json()
+        parsed = parse_chat_request()
+        if isinstance(parsed, Response):
+            return parsed
+        message, session_id, chat_context = parsed
         
-        # Validate message is present
-        if 'message' not in data:
-            return jsonify({
-                'success': False,
-                'message': 'Missing required field: message',
-                'error': 'MISSING_FIELD'
-            }), 400
-        
-        message = data['message']
-        context = data.get('context', {})
-        
-        # Validate message is not empty
-        if not message or not message.strip():
-            return jsonify({
-                'success': False,
-                'message': 'message cannot be empty',
-                'error': 'EMPTY_MESSAGE'
-            }), 400
-        
-        # Get or create session ID for conversation history
-        session_id = get_session_id()
-        if not session_id:
-            session_id = str(uuid.uuid4())
-            if hasattr(session, '__setitem__'):
-                session['session_id'] = session_id
-        
-        # Get conversation history for this session
-        if session_id not in conversation_history:
-            conversation_history[session_id] = []
-        
-        history = conversation_history[session_id]
-        
-        # Prepare context with history
-        chat_context = {
-            'profile': context.get('profile', {}),
-            'roadmap_summary': context.get('roadmap_summary', ''),
-            'history': history[-10:]  # Last 10 exchanges
-        }
-        
-        logger.info(f"Processing chat message (session: {session_id[:8]}...)")
+        logger.info("Processing chat message (session: %s...)", session_id[:8])
         
         # Call AI service for chat response
         try:
             response_text = ai_service.chat_assistant(message, chat_context)
             
             # Update conversation history
-            history.append({
-                'user': message,
-                'assistant': response_text
-            })
-            # Keep only last 20 exchanges to avoid memory issues
-            conversation_history[session_id] = history[-20:]
+            record_chat_exchange(session_id, message, response_text)
             
             logger.info("Chat response generated successfully")
             
@@ -530,74 +684,160 @@ def chat():
                 'message': 'Chat response generated successfully'
             }), 200
             
+        except RateLimitExceeded as e:
+            logger.warning("Chat rate limited: %s", e)
+            return rate_limit_response(e)
         except ValueError as e:
-            logger.error(f"Chat error: {str(e)}")
+            logger.error("Chat error: %s", e)
             return jsonify({
                 'success': False,
                 'message': f'Chat failed: {str(e)}',
                 'error': 'CHAT_ERROR'
             }), 400
         except TimeoutError as e:
-            logger.error(f"Chat timeout: {str(e)}")
-            return jsonify({
-                'success': False,
-                'message': 'Chat timed out. Please try again.',
-                'error': 'TIMEOUT_ERROR'
-            }), 504
+            logger.error("Chat timeout: %s", e)
+            return error_response(ERR_CHAT_TIMEOUT)
         
     except Exception as e:
-        logger.error(f"Unexpected error in chat: {str(e)}", exc_info=True)
-        return jsonify({
-            'success': False,
-            'message': 'An unexpected error occurred during chat.',
-            'error': 'INTERNAL_ERROR'
-        }), 500
+        logger.error("Unexpected error in chat: %s", e, exc_info=True)
+        return error_response(ERR_CHAT_INTERNAL)
+
+@api_bp.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    """
+    Streaming chat endpoint using Server-Sent Events.
+    Accepts: { "message": "...", "context": {...} }
+    Returns: text/event-stream of `data: {"delta": "..."}` messages, followed by
+    a `done` event with the full response or an `error` event
+    """
+    try:
+        logger.info("Received streaming chat request")
+        
+        parsed = parse_chat_request()
+        if isinstance(parsed, Response):
+            return parsed
+        message, session_id, chat_context = parsed
+        
+        logger.info("Streaming chat message (session: %s...)", session_id[:8])
+        
+        def generate():
+            try:
+                # The stream returns the cleaned full reply once it is exhausted
+                stream = ai_service.chat_assistant_stream(message, chat_context)
+                while True:
+                    try:
+                        delta = next(stream)
+                    except StopIteration as done:
+                        response_text = done.value
+                        break
+                    yield sse_event({'delta': delta})
+            except RateLimitExceeded as e:
+                logger.warning("Chat stream rate limited: %s", e)
+                yield sse_event({'message': str(e), 'error': 'RATE_LIMITED', 'retry_after': e.retry_after}, event='error')
+                return
+            except TimeoutError as e:
+                logger.error("Chat stream timeout: %s", e)
+                yield sse_event({'message': 'Chat timed out. Please try again.', 'error': 'TIMEOUT_ERROR'}, event='error')
+                return
+            except ValueError as e:
+                logger.error("Chat stream error: %s", e)
+                yield sse_event({'message': f'Chat failed: {str(e)}', 'error': 'CHAT_ERROR'}, event='error')
+                return
+            except Exception as e:
+                logger.error("Unexpected error in chat stream: %s", e, exc_info=True)
+                yield sse_event({'message': 'An unexpected error occurred during chat.', 'error': 'INTERNAL_ERROR'}, event='error')
+                return
+            
+            record_chat_exchange(session_id, message, response_text)
+            
+            logger.info("Streaming chat response completed")
+            yield sse_event({'response': response_text}, event='done')
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+        
+    except Exception as e:
+        logger.error("Unexpected error in chat stream: %s", e, exc_info=True)
+        return error_response(ERR_CHAT_INTERNAL)
+
+@dataclass
+class HealthStatus:
+    """Last known OpenRouter health, refreshed in the background."""
+    openrouter_status: str
+    openrouter_model: str
+    checked_at: float
+    api_error: Optional[str] = None
+
+HEALTH_REFRESH_SECONDS = 30
+
+_health = HealthStatus(
+    openrouter_status='connected' if ai_service and hasattr(ai_service, 'client') else 'not_initialized',
+    openrouter_model=ai_service.MODEL_NAME,
+    checked_at=time.time()
+)
+_health_refresher = None
+_health_refresher_lock = threading.Lock()
+
+def _refresh_health_forever():
+    """Probe OpenRouter every HEALTH_REFRESH_SECONDS and publish the result."""
+    global _health
+    while True:
+        error = ai_service.check_connection()
+        _health = HealthStatus(
+            openrouter_status='connected' if error is None else 'error',
+            openrouter_model=ai_service.MODEL_NAME,
+            checked_at=time.time(),
+            api_error=error
+        )
+        time.sleep(HEALTH_REFRESH_SECONDS)
+
+def _ensure_health_refresher():
+    """Start the background health probe on first use."""
+    global _health_refresher
+    if _health_refresher is not None:
+        return
+    with _health_refresher_lock:
+        if _health_refresher is None:
+            _health_refresher = threading.Thread(
+                target=_refresh_health_forever,
+                name='health-refresher',
+                daemon=True
+            )
+            _health_refresher.start()
 
 @api_bp.route('/health', methods=['GET'])
 def health():
     """
     Health check endpoint - Check if API and OpenRouter are working.
+    
+    Reports the cached result of the background OpenRouter probe, so load
+    balancer checks never wait on (or add traffic to) OpenRouter.
     """
     try:
-        logger.info("Health check requested")
-        
-        # Test OpenRouter API connection
-        api_status = 'unknown'
-        api_error = None
-        
-        try:
-            # Simple test - just check if service is initialized
-            if ai_service and hasattr(ai_service, 'client'):
-                api_status = 'connected'
-                logger.info("OpenRouter API health check: OK")
-            else:
-                api_status = 'not_initialized'
-                api_error = 'AIService not properly initialized'
-        except Exception as e:
-            api_status = 'error'
-            api_error = str(e)
-            logger.warning(f"OpenRouter API health check failed: {str(e)}")
+        _ensure_health_refresher()
+        status = _health
+        connected = status.openrouter_status == 'connected'
         
         health_data = {
-            'status': 'ok' if api_status == 'connected' else 'degraded',
+            'status': 'ok' if connected else 'degraded',
             'api': 'Career Roadmap Generator API',
-            'openrouter_status': api_status,
-            'openrouter_model': ai_service.MODEL_NAME if api_status == 'connected' else 'unknown',
-            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            'openrouter_status': status.openrouter_status,
+            'openrouter_model': status.openrouter_model if connected else 'unknown',
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(status.checked_at))
         }
         
-        if api_error:
-            health_data['api_error'] = api_error
-        
-        status_code = 200 if api_status == 'connected' else 503
+        if status.api_error:
+            health_data['api_error'] = status.api_error
         
-        return jsonify(health_data), status_code
+        return jsonify(health_data), 200 if connected else 503
         
     except Exception as e:
-        logger.error(f"Health check error: {str(e)}", exc_info=True)
+        logger.error("Health check error: %s", e, exc_info=True)
         return jsonify({
             'status': 'error',
             'message': 'Health check failed',
             'error': str(e)
         }), 500
-
@@ -3,9 +3,11 @@ Flask application entry point for Career Roadmap Generator API.
 """
 import logging
 import os
-from flask import Flask, jsonify
+import orjson
+from flask import Flask, jsonify, request
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-from api.routes import api_bp
+from api.routes import api_bp, MAX_UPLOAD_BYTES
 
 # Configure logging
 logging.basicConfig(
@@ -16,17 +18,77 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+class OrJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson for faster encoding of large roadmap payloads."""
+    
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = OrJSONProvider(app)
+
+# Configure CORS for frontend (extra origins via comma-separated ALLOWED_ORIGINS)
+DEFAULT_ORIGINS = ["http://localhost:5173", "http://localhost:3000", "http://127.0.0.1:5173", "http://127.0.0.1:3000"]
+ALLOWED_ORIGINS = frozenset(
+    origin.strip()
+    for origin in DEFAULT_ORIGINS + os.getenv('ALLOWED_ORIGINS', '').split(',')
+    if origin.strip()
+)
+CORS_METHODS = ["GET", "POST", "OPTIONS"]
+CORS_ALLOW_HEADERS = ["Content-Type", "Authorization"]
 
-# Configure CORS for frontend
 CORS(app, resources={
     r"/api/*": {
-        "origins": ["http://localhost:5173", "http://localhost:3000", "http://127.0.0.1:5173", "http://127.0.0.1:3000"],
-        "methods": ["GET", "POST", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization"]
+        "origins": sorted(ALLOWED_ORIGINS),
+        "methods": CORS_METHODS,
+        "allow_headers": CORS_ALLOW_HEADERS
     }
 })
 
+# Preflight response headers precomputed per allowed origin
+PREFLIGHT_HEADERS = {
+    origin: {
+        'Access-Control-Allow-Origin': origin,
+        'Access-Control-Allow-Methods': ', '.join(CORS_METHODS),
+        'Access-Control-Allow-Headers': ', '.join(CORS_ALLOW_HEADERS),
+        'Vary': 'Origin'
+    }
+    for origin in ALLOWED_ORIGINS
+}
+PREFLIGHT_METHODS = frozenset(CORS_METHODS)
+PREFLIGHT_ALLOW_HEADERS = frozenset(header.lower() for header in CORS_ALLOW_HEADERS)
+
+def preflight_request_allowed():
+    """Check the method and headers a preflight asks for against the CORS config."""
+    if request.headers.get('Access-Control-Request-Method') not in PREFLIGHT_METHODS:
+        return False
+    requested = request.headers.get('Access-Control-Request-Headers', '')
+    return all(
+        header.strip().lower() in PREFLIGHT_ALLOW_HEADERS
+        for header in requested.split(',')
+        if header.strip()
+    )
+
+@app.before_request
+def answer_cors_preflight():
+    """Answer API preflights from allowed origins with a set lookup and cached headers."""
+    if request.method != 'OPTIONS' or not request.path.startswith('/api/'):
+        return None
+    headers = PREFLIGHT_HEADERS.get(request.headers.get('Origin'))
+    if headers is None or not preflight_request_allowed():
+        return None  # Unknown origin, method or header: let flask_cors handle (and reject) it
+    return app.response_class(status=200, headers=headers)
+
+# Reject bodies larger than the biggest allowed upload (5MB file + multipart overhead)
+# at the WSGI layer, before any route code runs
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES
+
 # Configure session
 app.config['SECRET_KEY'] = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
 app.config['SESSION_TYPE'] = 'filesystem'
@@ -47,7 +109,7 @@ def health_check():
 @app.errorhandler(Exception)
 def handle_error(error):
     """Global error handler for all exceptions."""
-    logger.error(f"Unhandled error: {str(error)}", exc_info=True)
+    logger.error("Unhandled error: %s", error, exc_info=True)
     
     error_type = type(error).__name__
     status_code = 500
@@ -76,6 +138,15 @@ def not_found(error):
         'error': 'NOT_FOUND'
     }), 404
 
+@app.errorhandler(413)
+def payload_too_large(error):
+    """Handle 413 errors."""
+    return jsonify({
+        'success': False,
+        'message': 'Request body is too large',
+        'error': 'PAYLOAD_TOO_LARGE'
+    }), 413
+
 @app.errorhandler(400)
 def bad_request(error):
     """Handle 400 errors."""
@@ -88,8 +159,8 @@ def bad_request(error):
 def check_openrouter_status():
     """Check if OpenRouter API is accessible."""
     try:
-        from services.ai_service import AIService
-        ai_service = AIService()
+        from services.ai_service import get_ai_service
+        ai_service = get_ai_service()
         return True, ai_service.MODEL_NAME
     except Exception as e:
         return False, str(e)
@@ -103,10 +174,10 @@ if __name__ == '__main__':
     api_ok, model_info = check_openrouter_status()
     
     if api_ok:
-        logger.info(f"✓ OpenRouter API: Connected")
-        logger.info(f"✓ Model: {model_info}")
+        logger.info("✓ OpenRouter API: Connected")
+        logger.info("✓ Model: %s", model_info)
     else:
-        logger.warning(f"✗ OpenRouter API: Not connected - {model_info}")
+        logger.warning("✗ OpenRouter API: Not connected - %s", model_info)
         logger.warning("  Make sure OPENROUTER_API_KEY is set in .env file")
     
     logger.info("=" * 60)
@@ -0,0 +1,24 @@
+"""
+Gunicorn configuration for Career Roadmap Generator API.
+
+Every API route spends almost all of its time waiting on OpenRouter, so each
+worker runs a pool of threads: an in-flight LLM call parks a cheap thread
+instead of a whole worker process. Picked up automatically by
+`gunicorn app:app` when run from the backend folder.
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# One process, many threads: uploaded resumes and chat history live in this
+# process's memory, so a second worker would miss sessions started on the
+# first. WEB_CONCURRENCY is deliberately not read since some hosts set it for
+# every app; only raise GUNICORN_WORKERS once session state is in a shared store
+workers = int(os.getenv('GUNICORN_WORKERS', '1'))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '32'))
+
+# Roadmap generation can take a couple of minutes including a retry
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '300'))
+graceful_timeout = 30
+keepalive = 5
@@ -2,24 +2,460 @@
 AI service for interacting with OpenRouter API (Llama 3.3 70B).
 """
 import os
-import json
+import atexit
 import logging
 import time
+import re
 import hashlib
-from typing import Dict, Any, Optional
+import random
+import sqlite3
+import threading
+from string import Template
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Generator, Iterator, List, Optional, Tuple
+import httpx
+import orjson
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import (
+    OpenAI, APIConnectionError, APIStatusError, APITimeoutError,
+    AuthenticationError, BadRequestError, RateLimitError
+)
+from utils.json_stream import JsonArrayStream
+from utils.rate_limiter import TokenBucket
+from utils.response_cache import ResponseCache, RedisResponseCache, SqliteResponseCache
+from utils.semantic_cache import SemanticCache
+from utils.session_store import format_exchange
+from utils.single_flight import SingleFlight
+from utils.skill_extractor import SkillExtractor
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Process-wide cap on in-flight OpenRouter calls, sized to the provider's rate limit
+OPENROUTER_CONCURRENCY = int(os.getenv('OPENROUTER_CONCURRENCY', '8'))
+_api_slots = threading.BoundedSemaphore(OPENROUTER_CONCURRENCY)
+
+# Process-wide HTTP/2 connection pools shared by every AIService, so calls reuse
+# warm TLS connections (and multiplex over them) instead of reconnecting
+_HTTP_TIMEOUT = httpx.Timeout(connect=10.0, read=120.0, write=10.0, pool=5.0)
+_HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60.0)
+# A dropped or refused connect is retried once at the transport level; anything
+# past the connect is left to the backoff loop in _call_openrouter_api
+_HTTP_CONNECT_RETRIES = 1
+_http_client = httpx.Client(
+    timeout=_HTTP_TIMEOUT,
+    transport=httpx.HTTPTransport(http2=True, limits=_HTTP_LIMITS, retries=_HTTP_CONNECT_RETRIES)
+)
+atexit.register(_http_client.close)
+
+# Process-wide request pacing so steady load stays just under the provider's RPM quota
+OPENROUTER_RPM = float(os.getenv('OPENROUTER_RPM', '20'))
+_request_bucket = TokenBucket(rate=OPENROUTER_RPM / 60.0, capacity=5)
+
+# Optional tokens-per-minute budget; each call is charged its estimated prompt size
+OPENROUTER_TPM = int(os.getenv('OPENROUTER_TPM', '0'))
+_token_bucket = TokenBucket(rate=OPENROUTER_TPM / 60.0, capacity=OPENROUTER_TPM / 6.0) if OPENROUTER_TPM else None
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate for Llama-family tokenizers (about 4 characters per token)."""
+    return len(text) // 4 + 1
+
+# Fields whose list order carries no meaning, canonicalized before hashing cache keys
+UNORDERED_CACHE_FIELDS = frozenset({
+    'skills', 'top_skills', 'recent_tech', 'domains', 'selected_tools', 'key_tools'
+})
+
+# Markdown code fence (optionally tagged json) around a model's JSON output;
+# an unterminated fence runs to the end of the text
+_JSON_FENCE = re.compile(r'```(?:json)?\s*(.*?)\s*(?:```|\Z)', re.DOTALL)
+# A markdown fence line (``` with an optional language tag) anywhere in a reply
+_FENCE_LINE = re.compile(r'^[ \t]*```[\w+-]*[ \t]*(?:\n|\Z)', re.MULTILINE)
+
+# Noise left behind by PDF/DOCX text extraction: embedded base64 blobs, runs of
+# horizontal whitespace and stacks of blank lines
+_BASE64_BLOB = re.compile(r'(?:data:[\w/+.-]+;base64,)?[A-Za-z0-9+/]{100,}={0,2}')
+_INLINE_SPACE = re.compile(r'[^\S\n]+')
+_BLANK_LINES = re.compile(r'\n\s*\n+')
+
+def compact_resume_text(text: str) -> str:
+    """
+    Strip extraction noise from resume text before it is sent to the model.
+
+    A resume pulled out of a PDF is often padded with repeated spaces, blank
+    lines and leftover base64 image data; dropping them shrinks the request
+    (and the prompt's token count) without losing any content.
+
+    Args:
+        text: Raw resume text
+
+    Returns:
+        str: Resume text with the noise removed
+    """
+    text = _BASE64_BLOB.sub(' ', text)
+    text = _INLINE_SPACE.sub(' ', text)
+    text = _BLANK_LINES.sub('\n\n', text)
+    return '\n'.join(line.strip() for line in text.split('\n')).strip()
+
+_URL = re.compile(r'https?://\S+')
+
+def summarize_roadmap_for_chat(roadmap: Any, max_chars: int = 1200) -> str:
+    """
+    Reduce a roadmap to the few lines the chat mentor needs.
+
+    A full roadmap dict becomes its duration, phase titles, first weeks' focus
+    and top skill gaps; a summary string is passed through. URLs are replaced
+    with a placeholder either way, so resource links neither cost prompt
+    tokens nor make otherwise identical contexts hash differently.
+
+    Args:
+        roadmap: Roadmap dict, or a summary string from an older client
+        max_chars: Length the summary is capped at
+
+    Returns:
+        str: Compact roadmap summary, empty if there is no roadmap
+    """
+    if isinstance(roadmap, dict):
+        lines = []
+        if roadmap.get('total_duration_weeks'):
+            lines.append(f"Duration: {roadmap['total_duration_weeks']} weeks")
+        phases = [p for p in roadmap.get('phases') or [] if isinstance(p, dict)]
+        if phases:
+            lines.append("Phases: " + "; ".join(
+                f"{p.get('phase_number', i + 1)}. {p.get('title', '')} ({p.get('duration_weeks', '?')} weeks)"
+                for i, p in enumerate(phases)
+            ))
+        focus = [w.get('primary_focus') for w in roadmap.get('weekly_schedule') or []
+                 if isinstance(w, dict) and w.get('primary_focus')]
+        if focus:
+            lines.append("First weeks: " + "; ".join(focus[:4]))
+        gaps = (roadmap.get('skill_gap_analysis') or {}).get('gaps') or []
+        if gaps:
+            lines.append("Key gaps: " + ", ".join(str(gap) for gap in gaps[:3]))
+        text = '\n'.join(lines)
+    else:
+        text = str(roadmap or '')
+    return _URL.sub('[url]', text)[:max_chars]
+
+def canonical_json(value: Any) -> bytes:
+    """Serialize a value deterministically (sorted keys) for hashing and comparison."""
+    return orjson.dumps(value, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+
+# Prompt templates, built once at import. Only the small per-request values are
+# substituted on each call. Static instructions go in the system message ahead of
+# the per-request user message, so every call with the same instructions shares
+# a prompt prefix the provider can cache.
+RESUME_ANALYSIS_INSTRUCTIONS = """
+Analyze the resume in the user's message and extract information in JSON format.
+
+Extract:
+1. Technical skills (list all programming languages, frameworks, tools, platforms)
+2. Years of experience (total professional experience)
+3. Current role/title
+4. Experience level (Junior/Mid-Level/Senior/Lead)
+5. Domain expertise (e.g., Web Dev, Data Science, Cloud, etc.)
+6. Recent technologies used (last 2 years)
+7. Strongest skills (top 5)
+
+Return ONLY a JSON object with keys: skills [string], years_of_experience number,
+current_role string, experience_level string, domains [string], recent_tech [string],
+top_skills [string].
+"""
+
+RESUME_ANALYSIS_PROMPT = Template("""
+Resume Text:
+$resume_text
+""")
+
+DOMAIN_RECOMMENDATION_INSTRUCTIONS = """
+Recommend 6-8 technology domains the professional profiled in the user's message
+should consider learning, focusing on:
+- High market demand
+- Natural skill progression from their current expertise
+- Emerging technologies
+- Career growth potential
+
+For each domain, provide:
+- Name
+- Why it's recommended for them specifically
+- Difficulty level (Easy/Moderate/Challenging based on their background)
+- Market demand (High/Medium)
+- Key tools/technologies in this domain (5-8 tools)
+
+Return ONLY a JSON object with key recommendations: [{domain string, reason string,
+difficulty string, market_demand string,
+key_tools [{name string, description string, learning_time_weeks number}]}].
+"""
+
+DOMAIN_RECOMMENDATION_PROMPT = Template("""
+Professional profile:
+
+Current Skills: $skills
+Experience Level: $experience_level
+Years of Experience: $years_of_experience
+Current Domains: $domains
+""")
+
+ROADMAP_HEADER_PROMPT = Template("""
+PROFILE:
+- Current Skills: $skills
+- Experience: $years_of_experience years
+- Level: $experience_level
+
+LEARNING GOALS:
+- Target Tools: $selected_tools
+- Available Time: $hours_per_week hours/week
+- Learning Style: $learning_style
+- Deadline: $deadline
+""")
+
+# Shared opening of every roadmap section's instructions
+ROADMAP_SECTION_INTRO = """
+You are creating part of a detailed, personalized learning roadmap for the professional
+described in the user's message.
+"""
+
+ROADMAP_PLAN_SECTION = ROADMAP_SECTION_INTRO + """
+Generate the schedule part of the roadmap:
+
+1. LEARNING PHASES (3-4 phases):
+   - Phase number and title
+   - Duration in weeks
+   - Tools covered in this phase
+   - Key learning objectives
+   - Milestones to achieve
+   - Weekly hour breakdown
+
+2. WEEKLY SCHEDULE (for first 4 weeks in detail):
+   - Week number
+   - Primary focus
+   - Specific daily tasks
+   - Learning resources to use
+   - Practice exercises
+   - Time allocation
+
+Return ONLY a JSON object with keys:
+- total_duration_weeks: number
+- estimated_completion_date: string
+- phases: [{phase_number number, title string, duration_weeks number, tools_covered [string],
+  learning_objectives [string], milestones [string], weekly_hours number}]
+- weekly_schedule: [{week_number number, primary_focus string, daily_tasks [string],
+  resources [string], practice_exercises [string], time_allocation string}]
+
+Be specific, practical, and realistic.
+"""
+
+ROADMAP_RESOURCES_SECTION = ROADMAP_SECTION_INTRO + """
+Generate the learning resources part of the roadmap.
+
+CURATED RESOURCES (for each tool):
+   - Resource title
+   - Type (Course/Video/Article/Documentation/Book)
+   - Platform (Coursera/YouTube/Medium/Official Docs)
+   - URL (real URLs to actual resources)
+   - Difficulty level
+   - Estimated time to complete
+   - Why this resource (brief explanation)
+   - Is it free? (true/false)
+
+Return ONLY a JSON object with key resources: [{title string, type string, platform string,
+url string, difficulty string, estimated_time string, why_this_resource string, is_free boolean}]
+
+Be specific and practical. Use real resource URLs.
+"""
+
+ROADMAP_INSIGHTS_SECTION = ROADMAP_SECTION_INTRO + """
+Generate the projects and insights part of the roadmap:
+
+1. PROJECT IDEAS (3-5 hands-on projects):
+   - Project title
+   - Description
+   - Technologies used
+   - Complexity level
+   - Estimated time
+   - Learning outcomes
+   - Step-by-step guidance
+
+2. CAREER INSIGHTS:
+   - How these skills fit together
+   - Career paths possible
+   - Market value of this skill combination
+   - Tips for success
+
+3. SKILL GAP ANALYSIS:
+   - What they already know that helps
+   - New concepts they'll need to learn
+   - Potential challenges
+   - How to overcome them
+
+Return ONLY a JSON object with keys:
+- projects: [{title string, description string, technologies [string], complexity string,
+  estimated_time string, learning_outcomes [string], steps [string]}]
+- career_insights: string
+- skill_gap_analysis: {strengths [string], gaps [string], challenges [string], strategies [string]}
+
+Be specific, practical, and realistic.
+"""
+
+# Top-level keys each roadmap section must return
+ROADMAP_SECTION_KEYS = {
+    ROADMAP_PLAN_SECTION: ('total_duration_weeks', 'phases', 'weekly_schedule'),
+    ROADMAP_RESOURCES_SECTION: ('resources',),
+    ROADMAP_INSIGHTS_SECTION: ('projects', 'career_insights', 'skill_gap_analysis'),
+}
+
+# Follow-up asking only for the keys a section reply left out
+ROADMAP_REPAIR_PROMPT = Template("""$prompt
+Your previous reply was missing these keys: $missing
+Return ONLY a JSON object with just these keys, in the format described above.
+""")
+
+CHAT_PROMPT = Template("""
+You are a friendly career mentor helping a professional with their learning journey.
+
+USER PROFILE:
+$profile
+
+THEIR ROADMAP:
+$roadmap_summary
+
+CONVERSATION HISTORY:
+$history
+
+USER QUESTION:
+$message
+
+Provide a helpful, encouraging, and specific answer. Be conversational and supportive.
+If they ask about timeline, difficulty, resources, or strategy, give actionable advice.
+Keep response under 200 words.
+""")
+
+# JSON Schemas for structured outputs. Models that support constrained decoding
+# can only produce matching JSON; others fall back to plain JSON object mode.
+def _string_list():
+    return {'type': 'array', 'items': {'type': 'string'}}
+
+RESUME_ANALYSIS_SCHEMA = {
+    'name': 'resume_analysis',
+    'strict': True,
+    'schema': {
+        'type': 'object',
+        'properties': {
+            'skills': _string_list(),
+            'years_of_experience': {'type': 'number'},
+            'current_role': {'type': 'string'},
+            'experience_level': {'type': 'string'},
+            'domains': _string_list(),
+            'recent_tech': _string_list(),
+            'top_skills': _string_list(),
+        },
+        'required': ['skills', 'years_of_experience', 'current_role', 'experience_level',
+                     'domains', 'recent_tech', 'top_skills'],
+        'additionalProperties': False,
+    },
+}
+
+DOMAIN_RECOMMENDATION_SCHEMA = {
+    'name': 'domain_recommendations',
+    'strict': True,
+    'schema': {
+        'type': 'object',
+        'properties': {
+            'recommendations': {
+                'type': 'array',
+                'items': {
+                    'type': 'object',
+                    'properties': {
+                        'domain': {'type': 'string'},
+                        'reason': {'type': 'string'},
+                        'difficulty': {'type': 'string'},
+                        'market_demand': {'type': 'string'},
+                        'key_tools': {
+                            'type': 'array',
+                            'items': {
+                                'type': 'object',
+                                'properties': {
+                                    'name': {'type': 'string'},
+                                    'description': {'type': 'string'},
+                                    'learning_time_weeks': {'type': 'number'},
+                                },
+                                'required': ['name', 'description', 'learning_time_weeks'],
+                                'additionalProperties': False,
+                            },
+                        },
+                    },
+                    'required': ['domain', 'reason', 'difficulty', 'market_demand', 'key_tools'],
+                    'additionalProperties': False,
+                },
+            },
+        },
+        'required': ['recommendations'],
+        'additionalProperties': False,
+    },
+}
+
+def _prompt_fingerprint(*templates) -> str:
+    """Short digest of prompt text, mixed into cache keys so template edits invalidate old entries."""
+    text = ''.join(t.template if isinstance(t, Template) else t for t in templates)
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+PROMPT_FINGERPRINTS = {
+    'analyze_resume': _prompt_fingerprint(RESUME_ANALYSIS_INSTRUCTIONS, RESUME_ANALYSIS_PROMPT),
+    'recommend_domains': _prompt_fingerprint(DOMAIN_RECOMMENDATION_INSTRUCTIONS, DOMAIN_RECOMMENDATION_PROMPT),
+    'generate_roadmap': _prompt_fingerprint(ROADMAP_HEADER_PROMPT, ROADMAP_PLAN_SECTION,
+                                            ROADMAP_RESOURCES_SECTION, ROADMAP_INSIGHTS_SECTION),
+    'chat_assistant': _prompt_fingerprint(CHAT_PROMPT),
+}
+
+# Roadmap section instructions are keyed by their fingerprint, hashed once here
+# instead of normalizing several KB of instructions into every section cache key
+ROADMAP_SECTION_FINGERPRINTS = {
+    section: _prompt_fingerprint(section)
+    for section in (ROADMAP_PLAN_SECTION, ROADMAP_RESOURCES_SECTION, ROADMAP_INSIGHTS_SECTION)
+}
+
+class RateLimitExceeded(ValueError):
+    """Raised when OpenRouter (or the local concurrency cap) rejects a call."""
+    
+    def __init__(self, message: str, retry_after: int = 5):
+        super().__init__(message)
+        self.retry_after = retry_after
+
 class AIService:
     """Service for AI-powered analysis and recommendations."""
     
+    __slots__ = (
+        '_api_key', '_client', '_skill_extractor', '_lazy_lock',
+        'cache', 'persistent_cache', '_cache_writer', 'semantic_cache', '_inflight',
+        '_json_mode_supported', '_json_schema_supported', '_prompt_caching_supported',
+        '_section_executor', '_prefetch_executor'
+    )
+    
     CACHE_TIMEOUT = 300  # 5 minutes in seconds
+    CACHE_MAXSIZE = 1024  # Entries kept before least recently used are evicted
+    CACHE_MAX_VALUE_BYTES = 256 * 1024  # Skip caching unusually large responses
+    CACHE_COMPRESS_MIN_BYTES = 4096  # Roadmap-sized responses are kept compressed in memory
+    PERSISTENT_CACHE_TTL = int(os.getenv('PERSISTENT_CACHE_TTL', '86400'))  # Redis tier, 24 hours
+    SEMANTIC_CACHE_SIZE = 2048  # Near-duplicate recommendation/roadmap entries kept
+    SEMANTIC_CACHE_THRESHOLD = 0.95  # Minimum similarity to reuse a response
+    INFLIGHT_WAIT_TIMEOUT = 180.0  # Seconds a duplicate request waits for the in-flight one
+    MAX_PROMPT_TOKENS = 32000  # Estimated prompt size rejected before any network call
+    CHAT_PROMPT_TOKEN_BUDGET = 6000  # Oldest chat history is dropped to stay under this
+    CHAT_EXCHANGE_MAX_CHARS = 640  # Cap on each past exchange from the client; room for format_exchange output
+    PREFETCH_RECOMMENDATIONS = os.getenv('PREFETCH_RECOMMENDATIONS', 'false').lower() == 'true'
+    PREFETCH_MIN_SPARE_REQUESTS = 2  # Request-bucket tokens left free for foreground calls before prefetching
+    PROMPT_CACHING = os.getenv('PROMPT_CACHING', 'false').lower() == 'true'  # Mark system prompts cacheable
     MODEL_NAME = "meta-llama/llama-3.3-70b-instruct:free"
     OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+    SECTION_WORKERS = 12  # Concurrent roadmap section calls across all requests
+    SLOT_WAIT_TIMEOUT = 30.0  # Seconds to wait for a free OpenRouter call slot
+    MAX_ATTEMPTS = 3  # Total tries per call for rate limits, timeouts and 5xx errors
+    RETRY_BASE_DELAY = 2.0  # First backoff delay in seconds, doubled on each retry
+    RETRY_MAX_DELAY = 60.0  # Upper bound for a single backoff delay
+    RETRY_DEADLINE = 240.0  # Stop retrying once a call has spent this long overall
+    CALL_TIMEOUT = 120.0  # Per-attempt limit for a single completion
+    TASK_DEADLINE = 300.0  # Hard limit on a call's wall-clock time, retries included
+    MAX_OUTPUT_TOKENS = 4096  # Completion cap; every prompt asks for far less than this
     
     def __init__(self):
         api_key = os.getenv('OPENROUTER_API_KEY')
@@ -27,127 +463,587 @@ class AIService:
             logger.error("OPENROUTER_API_KEY not found in environment variables")
             raise ValueError("OPENROUTER_API_KEY not found in environment variables")
         
+        # API clients and the skill extractor are built on first use, so workers
+        # that never serve an AI request don't pay for them
+        self._api_key = api_key
+        self._client = None
+        self._skill_extractor = None
+        self._lazy_lock = threading.Lock()
+        
+        # Bounded response cache shared by all AI methods
+        self.cache = ResponseCache(
+            maxsize=self.CACHE_MAXSIZE,
+            ttl=self.CACHE_TIMEOUT,
+            max_value_bytes=self.CACHE_MAX_VALUE_BYTES,
+            compress_min_bytes=self.CACHE_COMPRESS_MIN_BYTES
+        )
+        # Optional shared tier that survives restarts and spans gunicorn workers
+        self.persistent_cache = self._create_persistent_cache()
+        self._cache_writer = None
+        if self.persistent_cache is not None:
+            # Persistent writes happen off the request path; flushed at exit
+            self._cache_writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix='cache-writer')
+            atexit.register(self._cache_writer.shutdown)
+        # Fallback for near-duplicate profiles that miss the exact cache
+        self.semantic_cache = SemanticCache(
+            maxsize=self.SEMANTIC_CACHE_SIZE,
+            threshold=self.SEMANTIC_CACHE_THRESHOLD,
+            ttl=self.CACHE_TIMEOUT
+        )
+        # Identical requests arriving before the first one is cached share its call
+        self._inflight = SingleFlight()
+        
+        # Cleared if the provider rejects response_format, so JSON calls fall back to plain prompts
+        self._json_mode_supported = True
+        # Cleared if the model can't do schema-constrained output; falls back to JSON object mode
+        self._json_schema_supported = True
+        # Cleared if the provider rejects cache_control on the system message
+        self._prompt_caching_supported = self.PROMPT_CACHING
+        
+        # Shared pool for issuing roadmap section calls concurrently
+        self._section_executor = ThreadPoolExecutor(
+            max_workers=self.SECTION_WORKERS,
+            thread_name_prefix='roadmap-section'
+        )
+        # Background speculative calls (e.g. recommendations right after analysis)
+        self._prefetch_executor = ThreadPoolExecutor(
+            max_workers=4,
+            thread_name_prefix='ai-prefetch'
+        )
+    
+    @property
+    def client(self) -> OpenAI:
+        """OpenAI client for OpenRouter, created on first use."""
+        if self._client is None:
+            with self._lazy_lock:
+                if self._client is None:
+                    # Retries are handled by _call_openrouter_api (backoff + jitter)
+                    self._client = self._create_client()
+        return self._client
+    
+    @property
+    def skill_extractor(self) -> SkillExtractor:
+        """Offline dictionary matcher used when AI resume analysis fails, loaded on first use."""
+        if self._skill_extractor is None:
+            with self._lazy_lock:
+                if self._skill_extractor is None:
+                    self._skill_extractor = SkillExtractor()
+        return self._skill_extractor
+    
+    def _create_client(self) -> OpenAI:
+        """
+        Build an OpenAI-compatible client for OpenRouter on the shared connection pool.
+        
+        Raises:
+            ValueError: If the client cannot be created
+        """
         try:
-            # Initialize OpenAI client for OpenRouter
-            # Using simple initialization to avoid version conflicts
-            import httpx
-            self.client = OpenAI(
-                api_key=api_key,
-                base_url=self.OPENROUTER_BASE_URL
+            client = OpenAI(
+                api_key=self._api_key,
+                base_url=self.OPENROUTER_BASE_URL,
+                max_retries=0,
+                http_client=_http_client
             )
-            logger.info(f"OpenRouter API initialized successfully with model: {self.MODEL_NAME}")
         except Exception as e:
-            logger.error(f"Failed to initialize OpenRouter API: {str(e)}")
+            logger.error("Failed to initialize OpenRouter API: %s", e)
             raise ValueError(f"Failed to initialize OpenRouter API: {str(e)}")
+        logger.info("OpenRouter API initialized successfully with model: %s", self.MODEL_NAME)
+        return client
+    
+    def _create_persistent_cache(self):
+        """
+        Connect the persistent cache tier, if one is configured.
+        
+        REDIS_URL selects a Redis tier shared across hosts; otherwise
+        AI_CACHE_PATH selects a SQLite file shared by the workers on this host.
+        
+        Returns:
+            RedisResponseCache, SqliteResponseCache, or None for in-memory only
+        """
+        redis_url = os.getenv('REDIS_URL')
+        if redis_url:
+            try:
+                persistent_cache = RedisResponseCache(redis_url, ttl=self.PERSISTENT_CACHE_TTL)
+                logger.info("Redis response cache enabled")
+                return persistent_cache
+            except ImportError:
+                logger.warning("REDIS_URL is set but the redis package is not installed; using in-memory cache only")
+                return None
         
-        # Response cache: {cache_key: (response, timestamp)}
-        self.cache = {}
+        cache_path = os.getenv('AI_CACHE_PATH')
+        if cache_path:
+            try:
+                persistent_cache = SqliteResponseCache(cache_path, ttl=self.PERSISTENT_CACHE_TTL)
+                logger.info("SQLite response cache enabled at %s", cache_path)
+                return persistent_cache
+            except sqlite3.Error as e:
+                logger.warning("Could not open SQLite cache at %s: %s; using in-memory cache only", cache_path, e)
+        return None
     
     def _get_cache_key(self, method_name: str, *args, **kwargs) -> str:
-        """Generate cache key from method name and arguments."""
+        """
+        Generate a cache key namespaced by method name, e.g. 'analyze_resume:<digest>'.
+        
+        Arguments are normalized first so inputs differing only in whitespace,
+        dict key order or the order of unordered lists share a key.
+        """
         cache_data = {
             'method': method_name,
-            'args': str(args),
-            'kwargs': str(sorted(kwargs.items()))
+            'prompt': PROMPT_FINGERPRINTS.get(method_name),
+            'args': args,
+            'kwargs': kwargs
         }
-        cache_string = json.dumps(cache_data, sort_keys=True)
-        return hashlib.md5(cache_string.encode()).hexdigest()
+        cache_bytes = canonical_json(self._normalize_for_cache(cache_data))
+        digest = hashlib.blake2b(cache_bytes, digest_size=16).hexdigest()
+        return f"{method_name}:{digest}"
+    
+    def _text_digest(self, text: str) -> str:
+        """
+        Digest a large text argument once, so the cache key hashes 32 characters
+        instead of re-encoding the full text into the key payload.
+        
+        Whitespace is normalized the same way _normalize_for_cache does it.
+        """
+        return hashlib.blake2b(' '.join(text.split()).encode(), digest_size=16).hexdigest()
+    
+    def _recommendation_cache_identity(self, profile: Dict[str, Any]):
+        """
+        Serialize a profile once for both its exact and semantic cache lookups.
+        
+        Returns:
+            tuple: (recommend_domains cache key, canonical profile text)
+        """
+        profile_bytes = canonical_json(self._normalize_for_cache(profile))
+        digest = hashlib.blake2b(profile_bytes, digest_size=16).hexdigest()
+        return self._get_cache_key('recommend_domains', digest), profile_bytes.decode()
+    
+    def _normalize_for_cache(self, value: Any, field: Optional[str] = None) -> Any:
+        """
+        Canonicalize a value for cache key hashing.
+        
+        Args:
+            value: Value to normalize (str, list, tuple, dict or scalar)
+            field: Dict key the value was found under, if any
+            
+        Returns:
+            Normalized copy of the value
+        """
+        if isinstance(value, str):
+            return ' '.join(value.split())
+        if isinstance(value, dict):
+            return {key: self._normalize_for_cache(item, key) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            items = [self._normalize_for_cache(item) for item in value]
+            if field in UNORDERED_CACHE_FIELDS:
+                items = sorted(
+                    (item.lower() if isinstance(item, str) else item for item in items),
+                    key=canonical_json
+                )
+            return items
+        return value
     
     def _get_cached_response(self, cache_key: str) -> Optional[Any]:
         """Get cached response if still valid."""
-        if cache_key in self.cache:
-            response, timestamp = self.cache[cache_key]
-            if time.time() - timestamp < self.CACHE_TIMEOUT:
-                logger.debug(f"Cache hit for key: {cache_key}")
-                return response
-            else:
-                # Remove expired cache entry
-                del self.cache[cache_key]
-                logger.debug(f"Cache expired for key: {cache_key}")
-        return None
+        response = self.cache.get(cache_key)
+        if response is not None:
+            logger.debug("Cache hit for key: %s", cache_key)
+            return response
+        
+        if self.persistent_cache is not None:
+            response = self.persistent_cache.get(cache_key)
+            if response is not None:
+                logger.debug("Persistent cache hit for key: %s", cache_key)
+                self.cache.set(cache_key, response)
+        return response
+    
+    def _get_cached_responses(self, cache_keys: List[str]) -> Dict[str, Any]:
+        """
+        Look up several keys, fetching the persistent-tier misses in one round trip.
+        
+        Persistent hits are copied into the in-memory tier like _get_cached_response does.
+        
+        Returns:
+            dict: cache key -> cached response for the keys that hit
+        """
+        found = {key: value for key, value in self.cache.get_many(cache_keys).items() if value}
+        misses = [key for key in dict.fromkeys(cache_keys) if key not in found]
+        if misses and self.persistent_cache is not None:
+            for key, value in self.persistent_cache.get_many(misses).items():
+                if value:
+                    logger.debug("Persistent cache hit for key: %s", key)
+                    self.cache.set(key, value)
+                    found[key] = value
+        return found
+    
+    def _warm_roadmap_sections(self, section_prompts: List[Tuple[str, str]]):
+        """Load cached roadmap sections from the persistent tier in one round trip before they are requested."""
+        if self.persistent_cache is not None:
+            self._get_cached_responses([self._roadmap_section_cache_key(system, prompt)
+                                        for system, prompt in section_prompts])
     
     def _cache_response(self, cache_key: str, response: Any):
-        """Cache response with current timestamp."""
-        self.cache[cache_key] = (response, time.time())
-        logger.debug(f"Cached response for key: {cache_key}")
+        """Cache response in memory immediately and in the persistent tier in the background."""
+        if self.cache.set(cache_key, response):
+            logger.debug("Cached response for key: %s", cache_key)
+        else:
+            logger.debug("Response too large to cache for key: %s", cache_key)
+        
+        if self._cache_writer is not None:
+            self._cache_writer.submit(self.persistent_cache.set, cache_key, response)
+    
+    def check_connection(self) -> Optional[str]:
+        """
+        Probe OpenRouter with a lightweight model listing call.
+        
+        Returns:
+            str: Error message if OpenRouter is unreachable, None if healthy
+        """
+        try:
+            self.client.models.list(timeout=10.0)
+            return None
+        except Exception as e:
+            logger.warning("OpenRouter connectivity probe failed: %s", e)
+            return str(e)
+    
+    def _retry_after_seconds(self, error: Exception, default: int = 5) -> int:
+        """Read the Retry-After header from an API error response, if present."""
+        response = getattr(error, 'response', None)
+        headers = getattr(response, 'headers', None) or {}
+        try:
+            return max(1, int(float(headers.get('retry-after', default))))
+        except (TypeError, ValueError):
+            return default
+    
+    def _completion_text(self, response) -> str:
+        """Pull the message text out of a chat completion, rejecting empty replies."""
+        if not response or not response.choices or len(response.choices) == 0:
+            raise ValueError("Empty response from OpenRouter API")
+        
+        response_text = response.choices[0].message.content
+        
+        if not response_text:
+            raise ValueError("Empty response content from OpenRouter API")
+        
+        if response.choices[0].finish_reason == 'length':
+            logger.warning("OpenRouter response was cut off at max_tokens (%s)", self.MAX_OUTPUT_TOKENS)
+        
+        usage = getattr(response, 'usage', None)
+        cached_tokens = getattr(getattr(usage, 'prompt_tokens_details', None), 'cached_tokens', None)
+        if cached_tokens:
+            logger.debug("Prompt cache hit: %s/%s prompt tokens", cached_tokens, usage.prompt_tokens)
+        
+        logger.info("OpenRouter API call successful")
+        return response_text.strip()
+    
+    def _translate_api_error(self, error: Exception) -> Exception:
+        """
+        Map a raw client error onto the exceptions callers handle.
+        
+        Args:
+            error: Exception raised by the OpenAI client
+            
+        Returns:
+            Exception: RateLimitExceeded, ValueError or TimeoutError to raise
+        """
+        error_msg = str(error).lower()
+        
+        # Handle rate limiting
+        if isinstance(error, RateLimitError) or 'quota' in error_msg or 'rate limit' in error_msg or '429' in error_msg:
+            logger.warning("Rate limit exceeded")
+            return RateLimitExceeded(
+                "API rate limit exceeded. Please try again in a few moments.",
+                retry_after=self._retry_after_seconds(error)
+            )
+        
+        # Handle invalid API key
+        if isinstance(error, AuthenticationError) or 'api key' in error_msg or 'authentication' in error_msg or 'invalid' in error_msg or '401' in error_msg:
+            logger.error("Invalid API key")
+            return ValueError("Invalid API key. Please check your OPENROUTER_API_KEY environment variable.")
+        
+        # Handle timeout
+        if isinstance(error, APITimeoutError) or 'timeout' in error_msg or 'timed out' in error_msg:
+            logger.warning("API timeout occurred")
+            return TimeoutError("API request timed out. Please try again.")
+        
+        # Generic error
+        logger.error("OpenRouter API error: %s", error)
+        return ValueError(f"API error: {str(error)}")
+    
+    def _is_retryable(self, error: Exception) -> bool:
+        """Whether an API error is transient: rate limits, timeouts, connection and 5xx errors."""
+        if isinstance(error, (RateLimitError, APITimeoutError, APIConnectionError)):
+            return True
+        if isinstance(error, APIStatusError):
+            return error.status_code >= 500
+        return isinstance(error, TimeoutError)
+    
+    def _retry_delay(self, error: Exception, attempt: int, started: float) -> Optional[float]:
+        """
+        Decide whether to retry a failed call and how long to back off first.
+        
+        Args:
+            error: Exception raised by the attempt
+            attempt: Number of attempts made so far (1-based)
+            started: time.monotonic() when the first attempt began
+            
+        Returns:
+            float: Seconds to sleep before retrying, or None to give up
+        """
+        if attempt >= self.MAX_ATTEMPTS or not self._is_retryable(error):
+            return None
+        
+        # Exponential backoff with jitter so concurrent callers don't retry in lockstep
+        delay = min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * (2 ** (attempt - 1)))
+        delay += random.uniform(0, 2)
+        if isinstance(error, RateLimitError):
+            delay = max(delay, self._retry_after_seconds(error, default=0))
+        
+        if time.monotonic() - started + delay > self.RETRY_DEADLINE:
+            return None
+        return delay
+    
+    def _completion_options(self, json_mode: bool, schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Extra chat.completions.create arguments for a call."""
+        options = {'max_tokens': self.MAX_OUTPUT_TOKENS}
+        if schema is not None and self._json_schema_supported:
+            options['response_format'] = {'type': 'json_schema', 'json_schema': schema}
+        elif (json_mode or schema is not None) and self._json_mode_supported:
+            options['response_format'] = {'type': 'json_object'}
+        return options
+    
+    def _attempt_timeout(self, started: float) -> float:
+        """
+        Timeout for the next attempt: CALL_TIMEOUT, cut short near TASK_DEADLINE.
+        
+        Args:
+            started: time.monotonic() when the first attempt began
+            
+        Raises:
+            TimeoutError: If the call has no time left
+        """
+        remaining = self.TASK_DEADLINE - (time.monotonic() - started)
+        if remaining <= 0:
+            raise TimeoutError("AI request timed out: total time budget used up")
+        return min(self.CALL_TIMEOUT, remaining)
+    
+    def _json_mode_rejected(self, error: Exception, json_mode: bool, schema: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Detect a provider refusing response_format and stop requesting it.
+        
+        A rejected JSON Schema first falls back to JSON object mode; a rejected
+        JSON object mode falls back to prompt-only JSON.
+        
+        Returns:
+            bool: True if the call should be retried immediately with a weaker format
+        """
+        if not isinstance(error, BadRequestError):
+            return False
+        message = str(error).lower()
+        if schema is not None and self._json_schema_supported:
+            if 'response_format' not in message and 'json_schema' not in message:
+                return False
+            logger.warning("Model rejected json_schema response_format; falling back to JSON object mode")
+            self._json_schema_supported = False
+            return True
+        if not ((json_mode or schema is not None) and self._json_mode_supported):
+            return False
+        if 'response_format' not in message:
+            return False
+        logger.warning("Model rejected response_format; falling back to prompt-only JSON")
+        self._json_mode_supported = False
+        return True
     
-    def _call_openrouter_api(self, prompt: str, retry: bool = True) -> str:
+    def _prompt_caching_rejected(self, error: Exception, system: Optional[str]) -> bool:
+        """
+        Detect a provider refusing the cache_control system message and stop sending it.
+        
+        Returns:
+            bool: True if the call should be retried immediately with a plain system message
+        """
+        if not (isinstance(error, BadRequestError) and system and self._prompt_caching_supported):
+            return False
+        logger.warning("Request with cache_control system message was rejected; sending plain system messages")
+        self._prompt_caching_supported = False
+        return True
+    
+    def _check_prompt_size(self, prompt: str, system: Optional[str] = None) -> int:
+        """
+        Estimate a prompt's token count, rejecting prompts too large to send.
+        
+        Args:
+            prompt: Prompt about to be sent
+            system: System message sent with it, if any
+            
+        Returns:
+            int: Estimated prompt tokens
+            
+        Raises:
+            ValueError: If the estimate exceeds MAX_PROMPT_TOKENS
+        """
+        prompt_tokens = estimate_tokens(prompt) + (estimate_tokens(system) if system else 0)
+        if prompt_tokens > self.MAX_PROMPT_TOKENS:
+            logger.warning("Rejecting oversized prompt: ~%s tokens", prompt_tokens)
+            raise ValueError(
+                f"Input is too large to process (~{prompt_tokens} tokens, max {self.MAX_PROMPT_TOKENS}). "
+                "Please shorten it and try again."
+            )
+        return prompt_tokens
+    
+    def _messages(self, prompt: str, system: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Chat messages for a call: the static system instructions first, then the prompt.
+        
+        With PROMPT_CACHING the system message carries an ephemeral cache_control
+        breakpoint, so providers that support prompt caching through OpenRouter
+        serve the instructions from cache. A provider that rejects that shape
+        switches the service back to a plain string system message.
+        """
+        messages = [{"role": "user", "content": prompt}]
+        if system:
+            if self._prompt_caching_supported:
+                content = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+            else:
+                content = system
+            messages.insert(0, {"role": "system", "content": content})
+        return messages
+    
+    def _call_openrouter_api(self, prompt: str, json_mode: bool = False, schema: Optional[Dict[str, Any]] = None,
+                             system: Optional[str] = None) -> str:
         """
         Call OpenRouter API with error handling and retry logic.
         
+        Transient failures are retried up to MAX_ATTEMPTS times with exponential
+        backoff and jitter.
+        
+        Args:
+            prompt: Prompt to send to OpenRouter (the user message)
+            json_mode: Ask the model for a JSON object response (response_format)
+            schema: Optional json_schema response_format spec constraining the output
+            system: Optional static instructions sent as a system message before the prompt
+            
+        Returns:
+            str: API response text
+            
+        Raises:
+            RateLimitExceeded: When rate limited or no call slot frees up in time
+            ValueError: For API errors or invalid API key
+            TimeoutError: For timeout errors
+        """
+        logger.info("Calling OpenRouter API with model: %s", self.MODEL_NAME)
+        logger.debug("Prompt length: %s characters", len(prompt))
+        prompt_tokens = self._check_prompt_size(prompt, system)
+        
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                # Pace requests to the RPM quota, then wait for a free slot so
+                # bursts queue here instead of triggering 429s
+                _request_bucket.acquire()
+                if _token_bucket is not None:
+                    _token_bucket.acquire(prompt_tokens)
+                if not _api_slots.acquire(timeout=self.SLOT_WAIT_TIMEOUT):
+                    logger.warning("No free OpenRouter call slot available")
+                    raise RateLimitExceeded("Too many AI requests in progress. Please try again in a few moments.")
+                try:
+                    response = self.client.chat.completions.create(
+                        model=self.MODEL_NAME,
+                        messages=self._messages(prompt, system),
+                        timeout=self._attempt_timeout(started),
+                        **self._completion_options(json_mode, schema)
+                    )
+                finally:
+                    _api_slots.release()
+                
+                return self._completion_text(response)
+                
+            except RateLimitExceeded:
+                raise
+            except Exception as e:
+                if self._json_mode_rejected(e, json_mode, schema) or self._prompt_caching_rejected(e, system):
+                    continue
+                delay = self._retry_delay(e, attempt, started)
+                if delay is None:
+                    raise self._translate_api_error(e) from e
+                logger.info("Retrying API call in %.1fs after error (attempt %s/%s): %s", delay, attempt, self.MAX_ATTEMPTS, e)
+                time.sleep(delay)
+    
+    def _stream_openrouter_api(self, prompt: str, json_mode: bool = False, schema: Optional[Dict[str, Any]] = None,
+                               system: Optional[str] = None) -> Iterator[str]:
+        """
+        Stream completion text from OpenRouter as it is generated.
+        
+        Failures opening the stream are retried like _call_openrouter_api;
+        errors after tokens have started flowing are raised to the caller.
+        
         Args:
-            prompt: Prompt to send to OpenRouter
-            retry: Whether to retry on failure
+            prompt: Prompt to send to OpenRouter (the user message)
+            json_mode: Ask the model for a JSON object response (response_format)
+            schema: Optional json_schema response_format spec constraining the output
+            system: Optional static instructions sent as a system message before the prompt
             
-        Returns:
-            str: API response text
+        Yields:
+            str: Text deltas in generation order
             
         Raises:
-            ValueError: For API errors, rate limiting, or invalid API key
+            RateLimitExceeded: When rate limited or no call slot frees up in time
+            ValueError: For API errors or invalid API key
             TimeoutError: For timeout errors
         """
-        try:
-            logger.info(f"Calling OpenRouter API with model: {self.MODEL_NAME}")
-            logger.debug(f"Prompt length: {len(prompt)} characters")
-            
-            response = self.client.chat.completions.create(
-                model=self.MODEL_NAME,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                timeout=120.0  # 120 second timeout (2 minutes) for longer AI responses
-            )
-            
-            if not response or not response.choices or len(response.choices) == 0:
-                raise ValueError("Empty response from OpenRouter API")
-            
-            response_text = response.choices[0].message.content
-            
-            if not response_text:
-                raise ValueError("Empty response content from OpenRouter API")
-            
-            logger.info("OpenRouter API call successful")
-            return response_text.strip()
-            
-        except Exception as e:
-            error_msg = str(e).lower()
-            
-            # Handle rate limiting
-            if 'quota' in error_msg or 'rate limit' in error_msg or '429' in error_msg:
-                logger.warning("Rate limit exceeded")
-                raise ValueError("API rate limit exceeded. Please try again in a few moments.")
-            
-            # Handle invalid API key
-            if 'api key' in error_msg or 'authentication' in error_msg or 'invalid' in error_msg or '401' in error_msg:
-                logger.error("Invalid API key")
-                raise ValueError("Invalid API key. Please check your OPENROUTER_API_KEY environment variable.")
-            
-            # Handle timeout
-            if 'timeout' in error_msg or 'timed out' in error_msg:
-                logger.warning("API timeout occurred")
-                if retry:
-                    logger.info("Retrying API call after timeout")
-                    time.sleep(2)
-                    return self._call_openrouter_api(prompt, retry=False)
+        logger.info("Streaming OpenRouter API call with model: %s", self.MODEL_NAME)
+        prompt_tokens = self._check_prompt_size(prompt, system)
+        
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            _request_bucket.acquire()
+            if _token_bucket is not None:
+                _token_bucket.acquire(prompt_tokens)
+            if not _api_slots.acquire(timeout=self.SLOT_WAIT_TIMEOUT):
+                logger.warning("No free OpenRouter call slot available")
+                raise RateLimitExceeded("Too many AI requests in progress. Please try again in a few moments.")
+            try:
+                try:
+                    stream = self.client.chat.completions.create(
+                        model=self.MODEL_NAME,
+                        messages=self._messages(prompt, system),
+                        stream=True,
+                        timeout=self._attempt_timeout(started),
+                        **self._completion_options(json_mode, schema)
+                    )
+                except Exception as e:
+                    if self._json_mode_rejected(e, json_mode, schema) or self._prompt_caching_rejected(e, system):
+                        continue
+                    delay = self._retry_delay(e, attempt, started)
+                    if delay is None:
+                        raise self._translate_api_error(e) from e
+                    logger.info("Retrying streaming API call in %.1fs after error (attempt %s/%s): %s", delay, attempt, self.MAX_ATTEMPTS, e)
                 else:
-                    raise TimeoutError("API request timed out. Please try again.")
-            
-            # Generic error
-            logger.error(f"OpenRouter API error: {str(e)}")
-            if retry:
-                logger.info("Retrying API call after error")
-                time.sleep(2)
-                return self._call_openrouter_api(prompt, retry=False)
-            else:
-                raise ValueError(f"API error: {str(e)}")
+                    # The slot stays held until the stream finishes or the consumer stops reading
+                    try:
+                        for chunk in stream:
+                            if chunk.choices:
+                                delta = chunk.choices[0].delta.content
+                                if delta:
+                                    yield delta
+                    except Exception as e:
+                        raise self._translate_api_error(e) from e
+                    finally:
+                        stream.close()
+                    return
+            finally:
+                _api_slots.release()
+            time.sleep(delay)
     
     def _extract_json_from_response(self, response_text: str) -> Dict[str, Any]:
         """
         Extract JSON from API response, handling markdown code blocks.
         
+        JSON-mode responses are parsed directly; fence stripping is only
+        attempted when that fails.
+        
         Args:
             response_text: Raw response text from API
             
@@ -158,97 +1054,93 @@ class AIService:
             ValueError: If JSON parsing fails
         """
         try:
-            # Remove markdown code blocks if present
-            if '```json' in response_text:
-                start = response_text.find('```json') + 7
-                end = response_text.find('```', start)
-                response_text = response_text[start:end].strip()
-            elif '```' in response_text:
-                start = response_text.find('```') + 3
-                end = response_text.find('```', start)
-                response_text = response_text[start:end].strip()
-            
-            # Parse JSON
-            data = json.loads(response_text)
-            logger.debug("JSON parsed successfully")
-            return data
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON parsing error: {str(e)}")
-            logger.debug(f"Response text: {response_text[:500]}")
-            raise ValueError(f"Failed to parse JSON response: {str(e)}")
+            return orjson.loads(response_text)
+        except orjson.JSONDecodeError as e:
+            error = e
+        
+        # Fall back to the contents of a markdown code block, if present
+        fence = _JSON_FENCE.search(response_text)
+        if fence:
+            try:
+                data = orjson.loads(fence.group(1))
+                logger.debug("JSON parsed successfully from code block")
+                return data
+            except orjson.JSONDecodeError as e:
+                error = e
+        
+        logger.error("JSON parsing error: %s", error)
+        logger.debug("Response text: %s", response_text[:500])
+        raise ValueError(f"Failed to parse JSON response: {str(error)}")
     
     def analyze_resume(self, resume_text: str) -> Dict[str, Any]:
         """
         Use OpenRouter (Llama 3.3) to extract structured information from resume.
         
+        If the AI call fails (outage, timeout, bad response), a basic
+        dictionary-based profile marked degraded=True is returned instead.
+        
         Args:
             resume_text: Text content of resume
             
         Returns:
             dict: Structured resume analysis with skills, experience, etc.
+            
+        Raises:
+            RateLimitExceeded: When rate limited, so the caller can ask the user to retry
         """
         try:
             logger.info("Starting resume analysis")
             
             # Check cache
-            cache_key = self._get_cache_key('analyze_resume', resume_text)
+            cache_key = self._get_cache_key('analyze_resume', self._text_digest(resume_text))
             cached = self._get_cached_response(cache_key)
             if cached:
                 return cached
             
-            prompt = f"""
-Analyze this resume and extract information in JSON format:
-
-Resume Text:
-{resume_text}
-
-Extract:
-1. Technical skills (list all programming languages, frameworks, tools, platforms)
-2. Years of experience (total professional experience)
-3. Current role/title
-4. Experience level (Junior/Mid-Level/Senior/Lead)
-5. Domain expertise (e.g., Web Dev, Data Science, Cloud, etc.)
-6. Recent technologies used (last 2 years)
-7. Strongest skills (top 5)
-
-Return ONLY valid JSON:
-
-{{
-  "skills": ["skill1", "skill2", ...],
-  "years_of_experience": number,
-  "current_role": "string",
-  "experience_level": "string",
-  "domains": ["domain1", "domain2"],
-  "recent_tech": ["tech1", "tech2"],
-  "top_skills": ["skill1", "skill2", ...]
-}}
-"""
-            
-            response_text = self._call_openrouter_api(prompt)
-            result = self._extract_json_from_response(response_text)
-            
-            # Validate required fields
-            required_fields = ['skills', 'years_of_experience', 'current_role', 
-                             'experience_level', 'domains', 'recent_tech', 'top_skills']
-            for field in required_fields:
-                if field not in result:
-                    logger.warning(f"Missing field in response: {field}")
-                    result[field] = [] if 'skills' in field or 'tech' in field or 'domains' in field else ""
-            
-            # Cache result
-            self._cache_response(cache_key, result)
+            result = self._inflight.do(cache_key, self._run_resume_analysis, resume_text, cache_key,
+                                       timeout=self.INFLIGHT_WAIT_TIMEOUT)
             
             logger.info("Resume analysis completed successfully")
             return result
             
-        except (ValueError, TimeoutError) as e:
-            logger.error(f"Resume analysis failed: {str(e)}")
+        except RateLimitExceeded:
+            # Surfaced so the route can answer 503 with Retry-After
             raise
+        except (ValueError, TimeoutError) as e:
+            logger.error("Resume analysis failed: %s", e)
+            return self._fallback_resume_analysis(resume_text)
         except Exception as e:
-            logger.error(f"Unexpected error in analyze_resume: {str(e)}", exc_info=True)
+            logger.error("Unexpected error in analyze_resume: %s", e, exc_info=True)
             raise ValueError(f"Failed to analyze resume: {str(e)}")
     
+    def _fallback_resume_analysis(self, resume_text: str) -> Dict[str, Any]:
+        """Build a degraded profile by dictionary matching; never cached."""
+        logger.warning("Falling back to offline skill extraction for resume analysis")
+        return self.skill_extractor.analyze(resume_text)
+    
+    def _run_resume_analysis(self, resume_text: str, cache_key: str) -> Dict[str, Any]:
+        """Call the model for a resume analysis and cache the result."""
+        prompt = self._resume_analysis_prompt(resume_text)
+        response_text = self._call_openrouter_api(prompt, json_mode=True, schema=RESUME_ANALYSIS_SCHEMA,
+                                                  system=RESUME_ANALYSIS_INSTRUCTIONS)
+        result = self._complete_resume_analysis(self._extract_json_from_response(response_text))
+        self._cache_response(cache_key, result)
+        return result
+    
+    def _resume_analysis_prompt(self, resume_text: str) -> str:
+        """Build the resume analysis prompt."""
+        return RESUME_ANALYSIS_PROMPT.substitute(resume_text=compact_resume_text(resume_text))
+    
+    def _complete_resume_analysis(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill in any fields missing from a resume analysis response."""
+        required_fields = ['skills', 'years_of_experience', 'current_role', 
+                         'experience_level', 'domains', 'recent_tech', 'top_skills']
+        for field in required_fields:
+            if field not in result:
+                logger.warning("Missing field in response: %s", field)
+                result[field] = [] if 'skills' in field or 'tech' in field or 'domains' in field else ""
+        return result
+    
     def recommend_domains(self, profile: Dict[str, Any]) -> Dict[str, Any]:
         """
         Based on user profile, recommend technology domains to explore.
@@ -263,78 +1155,322 @@ Return ONLY valid JSON:
             logger.info("Starting domain recommendations")
             
             # Check cache
-            cache_key = self._get_cache_key('recommend_domains', json.dumps(profile, sort_keys=True))
+            cache_key, profile_text = self._recommendation_cache_identity(profile)
             cached = self._get_cached_response(cache_key)
             if cached:
                 return cached
             
-            prompt = f"""
-Given this professional profile:
-
-Current Skills: {profile.get('skills', [])}
-Experience Level: {profile.get('experience_level', 'Unknown')}
-Years of Experience: {profile.get('years_of_experience', 0)}
-Current Domains: {profile.get('domains', [])}
-
-Recommend 6-8 technology domains they should consider learning, focusing on:
-- High market demand
-- Natural skill progression from their current expertise
-- Emerging technologies
-- Career growth potential
-
-For each domain, provide:
-- Name
-- Why it's recommended for them specifically
-- Difficulty level (Easy/Moderate/Challenging based on their background)
-- Market demand (High/Medium)
-- Key tools/technologies in this domain (5-8 tools)
-
-Return ONLY valid JSON:
-
-{{
-  "recommendations": [
-    {{
-      "domain": "string",
-      "reason": "string",
-      "difficulty": "string",
-      "market_demand": "string",
-      "key_tools": [
-        {{
-          "name": "string",
-          "description": "string",
-          "learning_time_weeks": number
-        }}
-      ]
-    }}
-  ]
-}}
-"""
-            
-            response_text = self._call_openrouter_api(prompt)
-            result = self._extract_json_from_response(response_text)
+            # Nearly identical profiles get the same recommendations
+            similar = self.semantic_cache.get(profile_text, scope='recommend_domains')
+            if similar is not None:
+                logger.debug("Semantic cache hit for domain recommendations")
+                return similar
             
-            # Validate structure
-            if 'recommendations' not in result:
-                logger.warning("Missing 'recommendations' field in response")
-                result['recommendations'] = []
-            
-            # Cache result
-            self._cache_response(cache_key, result)
+            result = self._inflight.do(cache_key, self._run_domain_recommendations, profile, profile_text, cache_key,
+                                       timeout=self.INFLIGHT_WAIT_TIMEOUT)
             
-            logger.info(f"Domain recommendations completed: {len(result.get('recommendations', []))} recommendations")
+            logger.info("Domain recommendations completed: %s recommendations", len(result.get('recommendations', [])))
             return result
             
         except (ValueError, TimeoutError) as e:
-            logger.error(f"Domain recommendation failed: {str(e)}")
+            logger.error("Domain recommendation failed: %s", e)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error in recommend_domains: {str(e)}", exc_info=True)
+            logger.error("Unexpected error in recommend_domains: %s", e, exc_info=True)
             raise ValueError(f"Failed to recommend domains: {str(e)}")
     
+    def prefetch_domain_recommendations(self, profile: Dict[str, Any]) -> None:
+        """
+        Start generating domain recommendations for a profile in the background.
+        
+        Called right after a resume is analyzed: the next step of the flow asks
+        for recommendations for that same profile, so by the time it does the
+        result is cached or still in flight (and joined via single-flight).
+        
+        The speculative call draws from the same OpenRouter rate limit as real
+        requests, so it is off by default (PREFETCH_RECOMMENDATIONS) and, when
+        enabled, skipped unless the request bucket has spare capacity.
+        
+        Args:
+            profile: User profile dict from analyze_resume
+        """
+        if not self.PREFETCH_RECOMMENDATIONS:
+            return
+        if _request_bucket.available() < self.PREFETCH_MIN_SPARE_REQUESTS:
+            logger.debug("Skipping recommendation prefetch; rate limit has no spare capacity")
+            return
+        future = self._prefetch_executor.submit(self.recommend_domains, profile)
+        future.add_done_callback(self._log_prefetch_failure)
+    
+    def _log_prefetch_failure(self, future) -> None:
+        """Log a failed background prefetch; the foreground request will retry it."""
+        error = future.exception()
+        if error is not None:
+            logger.warning("Recommendation prefetch failed: %s", error)
+    
+    def stream_domain_recommendations(self, profile: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield domain recommendations one at a time as the model generates them.
+        
+        The response is streamed and each recommendation is parsed as soon as
+        its object closes, so the first one reaches the caller long before the
+        full response is done. The complete result is cached like
+        recommend_domains once the stream finishes.
+        
+        Args:
+            profile: User profile dict from analyze_resume
+            
+        Yields:
+            dict: Recommendations in the order the model produced them
+            
+        Raises:
+            RateLimitExceeded: When rate limited
+            ValueError: For API errors or an unparseable response
+            TimeoutError: For timeout errors
+        """
+        logger.info("Starting streaming domain recommendations")
+        
+        cache_key, profile_text = self._recommendation_cache_identity(profile)
+        cached = self._get_cached_response(cache_key)
+        if cached is None:
+            cached = self.semantic_cache.get(profile_text, scope='recommend_domains')
+        if cached:
+            yield from cached.get('recommendations', [])
+            return
+        
+        parser = JsonArrayStream('recommendations')
+        streamed = []
+        for delta in self._stream_openrouter_api(self._domain_recommendation_prompt(profile), json_mode=True,
+                                                 schema=DOMAIN_RECOMMENDATION_SCHEMA,
+                                                 system=DOMAIN_RECOMMENDATION_INSTRUCTIONS):
+            for item in parser.feed(delta):
+                streamed.append(item)
+                yield item
+        
+        try:
+            result = self._complete_domain_recommendations(self._extract_json_from_response(parser.text))
+        except ValueError:
+            if not streamed:
+                raise
+            result = {'recommendations': streamed}
+        
+        # Anything the incremental parser missed is still in the full parse
+        yield from result['recommendations'][len(streamed):]
+        
+        self._cache_response(cache_key, result)
+        self.semantic_cache.set(profile_text, result, scope='recommend_domains')
+        logger.info("Streaming domain recommendations completed: %s recommendations", len(result['recommendations']))
+    
+    def _run_domain_recommendations(self, profile: Dict[str, Any], profile_text: str, cache_key: str) -> Dict[str, Any]:
+        """Call the model for domain recommendations and cache the result."""
+        prompt = self._domain_recommendation_prompt(profile)
+        response_text = self._call_openrouter_api(prompt, json_mode=True, schema=DOMAIN_RECOMMENDATION_SCHEMA,
+                                                  system=DOMAIN_RECOMMENDATION_INSTRUCTIONS)
+        result = self._complete_domain_recommendations(self._extract_json_from_response(response_text))
+        self._cache_response(cache_key, result)
+        self.semantic_cache.set(profile_text, result, scope='recommend_domains')
+        return result
+    
+    def _domain_recommendation_prompt(self, profile: Dict[str, Any]) -> str:
+        """Build the domain recommendation prompt."""
+        return DOMAIN_RECOMMENDATION_PROMPT.substitute(
+            skills=profile.get('skills', []),
+            experience_level=profile.get('experience_level', 'Unknown'),
+            years_of_experience=profile.get('years_of_experience', 0),
+            domains=profile.get('domains', [])
+        )
+    
+    def _complete_domain_recommendations(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Ensure a domain recommendation response has a recommendations list."""
+        if 'recommendations' not in result:
+            logger.warning("Missing 'recommendations' field in response")
+            result['recommendations'] = []
+        return result
+    
+    def _roadmap_header(self, user_data: Dict[str, Any]) -> str:
+        """Build the profile/goals block shared by every roadmap section prompt."""
+        profile = user_data.get('profile', {})
+        return ROADMAP_HEADER_PROMPT.substitute(
+            skills=profile.get('skills', []),
+            years_of_experience=profile.get('years_of_experience', 0),
+            experience_level=profile.get('experience_level', 'Unknown'),
+            selected_tools=user_data.get('selected_tools', []),
+            hours_per_week=user_data.get('hours_per_week', 10),
+            learning_style=user_data.get('learning_style', 'Balanced'),
+            deadline=user_data.get('deadline', 'Flexible')
+        )
+    
+    def _roadmap_plan_prompt(self, header: str) -> Tuple[str, str]:
+        """(instructions, prompt) for the phases and weekly schedule section of the roadmap."""
+        return ROADMAP_PLAN_SECTION, header
+    
+    def _roadmap_resources_prompt(self, header: str) -> Tuple[str, str]:
+        """(instructions, prompt) for the curated resources section of the roadmap."""
+        return ROADMAP_RESOURCES_SECTION, header
+    
+    def _roadmap_insights_prompt(self, header: str) -> Tuple[str, str]:
+        """(instructions, prompt) for the projects, career insights and skill gap section of the roadmap."""
+        return ROADMAP_INSIGHTS_SECTION, header
+    
+    def _roadmap_section_prompts(self, user_data: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """Build the independent (instructions, prompt) pairs that together make up a roadmap."""
+        header = self._roadmap_header(user_data)
+        return [
+            self._roadmap_plan_prompt(header),
+            self._roadmap_resources_prompt(header),
+            self._roadmap_insights_prompt(header),
+        ]
+    
+    def _roadmap_section_cache_key(self, system: str, prompt: str) -> str:
+        """Cache key for one roadmap section, using the precomputed fingerprint of its instructions."""
+        fingerprint = ROADMAP_SECTION_FINGERPRINTS.get(system) or self._text_digest(system)
+        return self._get_cache_key('roadmap_section', fingerprint, prompt)
+    
+    def _generate_roadmap_section(self, system: str, prompt: str) -> Dict[str, Any]:
+        """
+        Run a single roadmap section (its instructions plus the shared profile prompt) and parse its JSON.
+        
+        Sections are cached individually, so when one section fails and the
+        roadmap is requested again only the missing sections are regenerated.
+        Sections are also single-flighted, so a streamed and a regular request
+        for the same roadmap running at once share each section call.
+        """
+        cache_key = self._roadmap_section_cache_key(system, prompt)
+        cached = self._get_cached_response(cache_key)
+        if cached:
+            return cached
+        
+        return self._inflight.do(cache_key, self._run_roadmap_section, system, prompt, cache_key,
+                                 timeout=self.INFLIGHT_WAIT_TIMEOUT)
+    
+    def _missing_section_keys(self, system: str, section: Dict[str, Any]) -> List[str]:
+        """Keys the section's instructions ask for that its reply doesn't contain."""
+        return [key for key in ROADMAP_SECTION_KEYS.get(system, ()) if key not in section]
+    
+    def _merge_section_repair(self, system: str, section: Dict[str, Any], missing: List[str],
+                              response_text: Optional[str]) -> List[str]:
+        """
+        Merge the keys returned by a repair call into a section.
+        
+        Args:
+            system: Section instructions
+            section: Parsed section, updated in place
+            missing: Keys the repair call was asked for
+            response_text: Raw repair reply, or None if the call failed
+            
+        Returns:
+            list: Keys still missing afterwards
+        """
+        if response_text is not None:
+            try:
+                repair = self._extract_json_from_response(response_text)
+            except ValueError:
+                repair = None
+            if isinstance(repair, dict):
+                section.update({key: repair[key] for key in missing if key in repair})
+        return self._missing_section_keys(system, section)
+    
+    def _run_roadmap_section(self, system: str, prompt: str, cache_key: str) -> Dict[str, Any]:
+        """
+        Request one roadmap section, parse its JSON and cache it.
+        
+        If the reply leaves out some of the section's keys, one follow-up call
+        asks for only those keys instead of regenerating the whole section. A
+        section still incomplete after that is returned (the roadmap falls back
+        to defaults for the gaps) but not cached, so the next request retries it.
+        """
+        response_text = self._call_openrouter_api(prompt, json_mode=True, system=system)
+        section = self._extract_json_from_response(response_text)
+        
+        missing = self._missing_section_keys(system, section)
+        if missing:
+            logger.warning("Roadmap section missing %s; requesting only those keys", ', '.join(missing))
+            try:
+                repair_text = self._call_openrouter_api(
+                    ROADMAP_REPAIR_PROMPT.substitute(prompt=prompt, missing=', '.join(missing)),
+                    json_mode=True, system=system
+                )
+            except (ValueError, TimeoutError) as e:
+                logger.warning("Roadmap section repair failed: %s", e)
+                repair_text = None
+            missing = self._merge_section_repair(system, section, missing, repair_text)
+        
+        if not missing:
+            self._cache_response(cache_key, section)
+        return section
+    
+    def _complete_roadmap(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill in any top-level fields missing from the merged roadmap sections."""
+        required_fields = ['total_duration_weeks', 'phases', 'weekly_schedule', 
+                         'resources', 'projects', 'career_insights', 'skill_gap_analysis']
+        for field in required_fields:
+            if field not in result:
+                logger.warning("Missing field in roadmap response: %s", field)
+                if field == 'skill_gap_analysis':
+                    result[field] = {'strengths': [], 'gaps': [], 'challenges': [], 'strategies': []}
+                elif field in ['phases', 'weekly_schedule', 'resources', 'projects']:
+                    result[field] = []
+                else:
+                    result[field] = ""
+        return result
+    
+    def _roadmap_similarity_key(self, user_data: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        Split roadmap inputs into a fuzzy part and an exact part for the semantic cache.
+        
+        Seniority (experience level and years) and the learning goals (tools,
+        hours, style, deadline) must match exactly and form the scope; only the
+        skill list is matched by similarity, so a roadmap is never reused for a
+        different level or time budget.
+        
+        Returns:
+            tuple: (skill text, scope)
+        """
+        profile = user_data.get('profile', {})
+        skills = sorted(str(skill).lower() for skill in profile.get('skills', []))
+        goals = canonical_json(self._normalize_for_cache({
+            'experience_level': profile.get('experience_level', 'Unknown'),
+            'years_of_experience': profile.get('years_of_experience', 0),
+            'selected_tools': user_data.get('selected_tools', []),
+            'hours_per_week': user_data.get('hours_per_week', 10),
+            'learning_style': user_data.get('learning_style', 'Balanced'),
+            'deadline': user_data.get('deadline', 'Flexible'),
+        }))
+        return ', '.join(skills), 'generate_roadmap:' + hashlib.blake2b(goals, digest_size=16).hexdigest()
+    
+    def _store_roadmap(self, cache_key: str, similarity_key: Tuple[str, str], result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Complete merged roadmap sections and cache the roadmap (exact and semantic).
+        
+        similarity_key is the (skill text, scope) pair the caller already
+        built for its semantic cache lookup, so it isn't recomputed here.
+        """
+        result = self._complete_roadmap(result)
+        self._cache_response(cache_key, result)
+        skills_text, roadmap_scope = similarity_key
+        self.semantic_cache.set(skills_text, result, scope=roadmap_scope)
+        return result
+    
+    def _run_roadmap(self, user_data: Dict[str, Any], cache_key: str, similarity_key: Tuple[str, str]) -> Dict[str, Any]:
+        """Request all roadmap sections concurrently, merge them and cache the result."""
+        section_prompts = self._roadmap_section_prompts(user_data)
+        self._warm_roadmap_sections(section_prompts)
+        futures = [self._section_executor.submit(self._generate_roadmap_section, system, prompt)
+                   for system, prompt in section_prompts]
+        result = {}
+        for future in futures:
+            result.update(future.result())
+        
+        return self._store_roadmap(cache_key, similarity_key, result)
+    
     def generate_roadmap(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Generate personalized learning roadmap.
         
+        The roadmap is generated as three independent sections (schedule,
+        resources, projects/insights) requested concurrently and merged, so
+        wall-clock time is bounded by the slowest section rather than the sum.
+        
         Args:
             user_data: Dict containing profile, selected_tools, hours_per_week, learning_style, deadline
             
@@ -345,170 +1481,75 @@ Return ONLY valid JSON:
             logger.info("Starting roadmap generation")
             
             # Check cache
-            cache_key = self._get_cache_key('generate_roadmap', json.dumps(user_data, sort_keys=True))
+            cache_key = self._get_cache_key('generate_roadmap', user_data)
             cached = self._get_cached_response(cache_key)
             if cached:
                 return cached
             
-            profile = user_data.get('profile', {})
-            selected_tools = user_data.get('selected_tools', [])
-            hours_per_week = user_data.get('hours_per_week', 10)
-            learning_style = user_data.get('learning_style', 'Balanced')
-            deadline = user_data.get('deadline', 'Flexible')
-            
-            prompt = f"""
-Create a detailed, personalized learning roadmap for this professional:
-
-PROFILE:
-- Current Skills: {profile.get('skills', [])}
-- Experience: {profile.get('years_of_experience', 0)} years
-- Level: {profile.get('experience_level', 'Unknown')}
-
-LEARNING GOALS:
-- Target Tools: {selected_tools}
-- Available Time: {hours_per_week} hours/week
-- Learning Style: {learning_style}
-- Deadline: {deadline}
-
-Generate a comprehensive roadmap with:
-
-1. LEARNING PHASES (3-4 phases):
-   - Phase number and title
-   - Duration in weeks
-   - Tools covered in this phase
-   - Key learning objectives
-   - Milestones to achieve
-   - Weekly hour breakdown
-
-2. WEEKLY SCHEDULE (for first 4 weeks in detail):
-   - Week number
-   - Primary focus
-   - Specific daily tasks
-   - Learning resources to use
-   - Practice exercises
-   - Time allocation
-
-3. CURATED RESOURCES (for each tool):
-   - Resource title
-   - Type (Course/Video/Article/Documentation/Book)
-   - Platform (Coursera/YouTube/Medium/Official Docs)
-   - URL (real URLs to actual resources)
-   - Difficulty level
-   - Estimated time to complete
-   - Why this resource (brief explanation)
-   - Is it free? (true/false)
-
-4. PROJECT IDEAS (3-5 hands-on projects):
-   - Project title
-   - Description
-   - Technologies used
-   - Complexity level
-   - Estimated time
-   - Learning outcomes
-   - Step-by-step guidance
-
-5. CAREER INSIGHTS:
-   - How these skills fit together
-   - Career paths possible
-   - Market value of this skill combination
-   - Tips for success
-
-6. SKILL GAP ANALYSIS:
-   - What they already know that helps
-   - New concepts they'll need to learn
-   - Potential challenges
-   - How to overcome them
-
-Return ONLY valid JSON with this exact structure:
-
-{{
-  "total_duration_weeks": number,
-  "estimated_completion_date": "string",
-  "phases": [
-    {{
-      "phase_number": number,
-      "title": "string",
-      "duration_weeks": number,
-      "tools_covered": ["tool1", "tool2"],
-      "learning_objectives": ["obj1", "obj2"],
-      "milestones": ["milestone1", "milestone2"],
-      "weekly_hours": number
-    }}
-  ],
-  "weekly_schedule": [
-    {{
-      "week_number": number,
-      "primary_focus": "string",
-      "daily_tasks": ["task1", "task2"],
-      "resources": ["resource1", "resource2"],
-      "practice_exercises": ["exercise1", "exercise2"],
-      "time_allocation": "string"
-    }}
-  ],
-  "resources": [
-    {{
-      "title": "string",
-      "type": "string",
-      "platform": "string",
-      "url": "string",
-      "difficulty": "string",
-      "estimated_time": "string",
-      "why_this_resource": "string",
-      "is_free": boolean
-    }}
-  ],
-  "projects": [
-    {{
-      "title": "string",
-      "description": "string",
-      "technologies": ["tech1", "tech2"],
-      "complexity": "string",
-      "estimated_time": "string",
-      "learning_outcomes": ["outcome1", "outcome2"],
-      "steps": ["step1", "step2"]
-    }}
-  ],
-  "career_insights": "string",
-  "skill_gap_analysis": {{
-    "strengths": ["strength1", "strength2"],
-    "gaps": ["gap1", "gap2"],
-    "challenges": ["challenge1", "challenge2"],
-    "strategies": ["strategy1", "strategy2"]
-  }}
-}}
-
-Be specific, practical, and realistic. Use real resource URLs.
-"""
-            
-            response_text = self._call_openrouter_api(prompt)
-            result = self._extract_json_from_response(response_text)
-            
-            # Validate required fields
-            required_fields = ['total_duration_weeks', 'phases', 'weekly_schedule', 
-                             'resources', 'projects', 'career_insights', 'skill_gap_analysis']
-            for field in required_fields:
-                if field not in result:
-                    logger.warning(f"Missing field in roadmap response: {field}")
-                    if field == 'skill_gap_analysis':
-                        result[field] = {'strengths': [], 'gaps': [], 'challenges': [], 'strategies': []}
-                    elif field in ['phases', 'weekly_schedule', 'resources', 'projects']:
-                        result[field] = []
-                    else:
-                        result[field] = ""
+            # Same goals for a nearly identical profile (e.g. one extra skill)
+            similarity_key = self._roadmap_similarity_key(user_data)
+            similar = self.semantic_cache.get(*similarity_key)
+            if similar is not None:
+                logger.debug("Semantic cache hit for roadmap")
+                return similar
             
-            # Cache result
-            self._cache_response(cache_key, result)
+            result = self._inflight.do(cache_key, self._run_roadmap, user_data, cache_key, similarity_key,
+                                       timeout=self.INFLIGHT_WAIT_TIMEOUT)
             
             logger.info("Roadmap generation completed successfully")
             return result
             
         except (ValueError, TimeoutError) as e:
-            logger.error(f"Roadmap generation failed: {str(e)}")
+            logger.error("Roadmap generation failed: %s", e)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error in generate_roadmap: {str(e)}", exc_info=True)
+            logger.error("Unexpected error in generate_roadmap: %s", e, exc_info=True)
             raise ValueError(f"Failed to generate roadmap: {str(e)}")
     
+    def stream_roadmap(self, user_data: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Generate a roadmap, yielding each section as soon as its call finishes.
+        
+        Sections are requested concurrently like generate_roadmap, but instead
+        of waiting for the slowest one the caller gets ('section', dict) for each
+        in completion order, then ('roadmap', dict) with the merged, cached
+        roadmap. A cached roadmap is yielded directly as ('roadmap', dict).
+        
+        Args:
+            user_data: Dict containing profile, selected_tools, hours_per_week, learning_style, deadline
+            
+        Yields:
+            tuple: (kind, payload) where kind is 'section' or 'roadmap'
+            
+        Raises:
+            RateLimitExceeded: When rate limited
+            ValueError: For API errors
+            TimeoutError: For timeout errors
+        """
+        logger.info("Starting streaming roadmap generation")
+        
+        cache_key = self._get_cache_key('generate_roadmap', user_data)
+        cached = self._get_cached_response(cache_key)
+        similarity_key = self._roadmap_similarity_key(user_data)
+        if cached is None:
+            cached = self.semantic_cache.get(*similarity_key)
+        if cached:
+            yield 'roadmap', cached
+            return
+        
+        section_prompts = self._roadmap_section_prompts(user_data)
+        self._warm_roadmap_sections(section_prompts)
+        futures = [self._section_executor.submit(self._generate_roadmap_section, system, prompt)
+                   for system, prompt in section_prompts]
+        result = {}
+        for future in as_completed(futures):
+            section = future.result()
+            result.update(section)
+            yield 'section', section
+        
+        yield 'roadmap', self._store_roadmap(cache_key, similarity_key, result)
+        logger.info("Streaming roadmap generation completed")
+    
     def chat_assistant(self, message: str, context: Dict[str, Any]) -> str:
         """
         Handle chat queries about the roadmap.
@@ -518,55 +1559,24 @@ Be specific, practical, and realistic. Use real resource URLs.
             context: Dict containing roadmap data, user profile, conversation history
             
         Returns:
-            str: AI response text
+            str: AI response text (an apology message if the call failed)
+            
+        Raises:
+            RateLimitExceeded: When rate limited
         """
         try:
             logger.info("Processing chat message")
             
+            context = self._compact_chat_context(context)
+            
             # Check cache (with message included)
-            cache_key = self._get_cache_key('chat_assistant', message, json.dumps(context, sort_keys=True))
+            cache_key = self._chat_cache_key(message, context)
             cached = self._get_cached_response(cache_key)
             if cached:
                 return cached
             
-            profile = context.get('profile', {})
-            roadmap_summary = context.get('roadmap_summary', '')
-            history = context.get('history', [])
-            
-            # Format conversation history
-            history_text = ""
-            if history:
-                history_text = "\n".join([f"User: {h.get('user', '')}\nAssistant: {h.get('assistant', '')}" 
-                                        for h in history[-5:]])  # Last 5 exchanges
-            
-            prompt = f"""
-You are a friendly career mentor helping a professional with their learning journey.
-
-USER PROFILE:
-{json.dumps(profile, indent=2) if profile else 'Not available'}
-
-THEIR ROADMAP:
-{roadmap_summary if roadmap_summary else 'Not available'}
-
-CONVERSATION HISTORY:
-{history_text if history_text else 'No previous conversation'}
-
-USER QUESTION:
-{message}
-
-Provide a helpful, encouraging, and specific answer. Be conversational and supportive.
-If they ask about timeline, difficulty, resources, or strategy, give actionable advice.
-Keep response under 200 words.
-"""
-            
-            response_text = self._call_openrouter_api(prompt)
-            
-            # Clean up response (remove markdown if present)
-            if response_text.startswith('```'):
-                lines = response_text.split('\n')
-                response_text = '\n'.join([line for line in lines if not line.strip().startswith('```')])
-            
-            response_text = response_text.strip()
+            prompt = self._chat_prompt(message, context)
+            response_text = self._clean_chat_response(self._call_openrouter_api(prompt))
             
             # Cache result
             self._cache_response(cache_key, response_text)
@@ -574,11 +1584,145 @@ Keep response under 200 words.
             logger.info("Chat response generated successfully")
             return response_text
             
+        except RateLimitExceeded:
+            # Surfaced so the route can answer 503 with Retry-After
+            raise
         except (ValueError, TimeoutError) as e:
-            logger.error(f"Chat assistant failed: {str(e)}")
+            logger.error("Chat assistant failed: %s", e)
             # Return user-friendly error message
             return f"I apologize, but I'm having trouble processing your request right now. {str(e)} Please try again in a moment."
         except Exception as e:
-            logger.error(f"Unexpected error in chat_assistant: {str(e)}", exc_info=True)
+            logger.error("Unexpected error in chat_assistant: %s", e, exc_info=True)
             return "I encountered an unexpected error. Please try rephrasing your question or try again later."
+    
+    def chat_assistant_stream(self, message: str, context: Dict[str, Any]) -> Generator[str, None, str]:
+        """
+        Stream a chat reply as the model generates it.
+        
+        Cached replies are yielded as a single chunk. A fresh reply is cached
+        only once the stream completes, so an abandoned stream caches nothing.
+        The raw chunks are cleaned once at the end; the cleaned reply is the
+        generator's return value, for callers that record or resend it.
+        
+        Args:
+            message: User's question/message
+            context: Dict containing roadmap data, user profile, conversation history
+            
+        Yields:
+            str: Chunks of the reply text
+            
+        Returns:
+            str: The full cleaned reply (the value of StopIteration)
+            
+        Raises:
+            RateLimitExceeded: When rate limited
+            ValueError: For API errors
+            TimeoutError: For timeout errors
+        """
+        logger.info("Processing streaming chat message")
+        
+        context = self._compact_chat_context(context)
+        cache_key = self._chat_cache_key(message, context)
+        cached = self._get_cached_response(cache_key)
+        if cached:
+            yield cached
+            return cached
+        
+        prompt = self._chat_prompt(message, context)
+        chunks = []
+        for delta in self._stream_openrouter_api(prompt):
+            chunks.append(delta)
+            yield delta
+        
+        response_text = self._clean_chat_response(''.join(chunks))
+        self._cache_response(cache_key, response_text)
+        logger.info("Streaming chat response completed")
+        return response_text
+    
+    def _compact_chat_context(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Shrink a chat context to what the mentor prompt needs.
+        
+        The roadmap is reduced to a short summary and each of the last 5
+        exchanges is capped at CHAT_EXCHANGE_MAX_CHARS. The compact context is
+        used for both the prompt and the cache keys, so it also keeps volatile
+        details like resource URLs from defeating the cache.
+        """
+        history = context.get('history', [])[-5:]
+        limit = self.CHAT_EXCHANGE_MAX_CHARS
+        return {
+            'profile': context.get('profile', {}),
+            'roadmap_summary': summarize_roadmap_for_chat(context.get('roadmap_summary', '')),
+            'history': [h[:limit] if isinstance(h, str) else
+                        {'user': str(h.get('user', ''))[:limit], 'assistant': str(h.get('assistant', ''))[:limit]}
+                        for h in history],
+        }
+    
+    def _chat_cache_key(self, message: str, context: Dict[str, Any]) -> str:
+        """
+        Build the exact cache key for a chat message.
+        
+        The profile and roadmap summary are serialized into one digest, and the
+        key hashes that digest plus the message and the last 5 exchanges the
+        prompt actually uses, rather than re-normalizing the whole context on
+        every request.
+        
+        Chat replies are only reused for an exact match: questions that differ
+        in a single number or a "not" look nearly identical to a similarity
+        check but need different answers.
+        """
+        scope_data = canonical_json([context.get('profile', {}), context.get('roadmap_summary', '')])
+        scope = hashlib.blake2b(scope_data, digest_size=16).hexdigest()
+        return self._get_cache_key('chat_assistant', scope, message, context.get('history', [])[-5:])
+    
+    def _chat_prompt(self, message: str, context: Dict[str, Any]) -> str:
+        """Build the mentor chat prompt from the message, profile, roadmap and history."""
+        profile = context.get('profile', {})
+        roadmap_summary = context.get('roadmap_summary', '')
+        history = context.get('history', [])
+        
+        # History arrives as pre-formatted exchanges; older callers pass dicts
+        exchanges = [h if isinstance(h, str) else format_exchange(str(h.get('user', '')), str(h.get('assistant', '')))
+                     for h in history[-5:]]  # Last 5 exchanges
+        
+        # Drop the oldest exchanges until the prompt fits the chat token budget
+        while True:
+            history_text = "\n".join(exchanges)
+            prompt = CHAT_PROMPT.substitute(
+                profile=orjson.dumps(profile, default=str, option=orjson.OPT_INDENT_2).decode() if profile else 'Not available',
+                roadmap_summary=roadmap_summary if roadmap_summary else 'Not available',
+                history=history_text if history_text else 'No previous conversation',
+                message=message
+            )
+            if not exchanges or estimate_tokens(prompt) <= self.CHAT_PROMPT_TOKEN_BUDGET:
+                return prompt
+            exchanges.pop(0)
+    
+    def _clean_chat_response(self, response_text: str) -> str:
+        """Strip markdown code fences the model sometimes wraps chat replies in."""
+        return _FENCE_LINE.sub('', response_text).strip()
+
 
+_shared_service = None
+_shared_service_lock = threading.Lock()
+
+def get_ai_service() -> AIService:
+    """
+    Get the process-wide AIService, creating it on first use.
+    
+    Every caller in a worker shares one instance, and with it one response
+    cache, single-flight table and set of executors. Sharing across workers
+    comes from the persistent cache tier (REDIS_URL or AI_CACHE_PATH).
+    
+    Returns:
+        AIService: Shared service instance
+        
+    Raises:
+        ValueError: If the service cannot be initialized (e.g. missing API key)
+    """
+    global _shared_service
+    if _shared_service is None:
+        with _shared_service_lock:
+            if _shared_service is None:
+                _shared_service = AIService()
+    return _shared_service
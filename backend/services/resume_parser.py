@@ -81,9 +81,9 @@ class ResumeParser:
                     page_text = page.extract_text()
                     if page_text:
                         text_parts.append(page_text)
-                    logger.debug(f"Extracted text from page {page_num + 1}")
+                    logger.debug("Extracted text from page %s", page_num + 1)
                 except Exception as e:
-                    logger.warning(f"Error extracting text from page {page_num + 1}: {str(e)}")
+                    logger.warning("Error extracting text from page %s: %s", page_num + 1, e)
                     continue
             
             raw_text = '\n'.join(text_parts)
@@ -94,7 +94,7 @@ class ResumeParser:
             cleaned_text = self._clean_text(raw_text)
             word_count = self._count_words(cleaned_text)
             
-            logger.info(f"PDF parsed successfully. Word count: {word_count}")
+            logger.info("PDF parsed successfully. Word count: %s", word_count)
             
             return {
                 'raw_text': cleaned_text,
@@ -103,7 +103,7 @@ class ResumeParser:
             }
             
         except Exception as e:
-            logger.error(f"Error parsing PDF: {str(e)}")
+            logger.error("Error parsing PDF: %s", e)
             raise ValueError(f"Failed to parse PDF file: {str(e)}")
     
     def parse_docx(self, file):
@@ -141,7 +141,7 @@ class ResumeParser:
             cleaned_text = self._clean_text(raw_text)
             word_count = self._count_words(cleaned_text)
             
-            logger.info(f"DOCX parsed successfully. Word count: {word_count}")
+            logger.info("DOCX parsed successfully. Word count: %s", word_count)
             
             return {
                 'raw_text': cleaned_text,
@@ -150,7 +150,7 @@ class ResumeParser:
             }
             
         except Exception as e:
-            logger.error(f"Error parsing DOCX: {str(e)}")
+            logger.error("Error parsing DOCX: %s", e)
             raise ValueError(f"Failed to parse DOCX file: {str(e)}")
     
     def parse_txt(self, file):
@@ -175,7 +175,7 @@ class ResumeParser:
                 try:
                     file.seek(0)
                     raw_text = file.read().decode(encoding)
-                    logger.debug(f"Successfully decoded with {encoding}")
+                    logger.debug("Successfully decoded with %s", encoding)
                     break
                 except (UnicodeDecodeError, AttributeError):
                     continue
@@ -192,7 +192,7 @@ class ResumeParser:
             cleaned_text = self._clean_text(raw_text)
             word_count = self._count_words(cleaned_text)
             
-            logger.info(f"TXT parsed successfully. Word count: {word_count}")
+            logger.info("TXT parsed successfully. Word count: %s", word_count)
             
             return {
                 'raw_text': cleaned_text,
@@ -201,7 +201,7 @@ class ResumeParser:
             }
             
         except Exception as e:
-            logger.error(f"Error parsing TXT: {str(e)}")
+            logger.error("Error parsing TXT: %s", e)
             raise ValueError(f"Failed to parse TXT file: {str(e)}")
     
     def parse_resume(self, file, filename):
@@ -219,7 +219,7 @@ class ResumeParser:
             ValueError: If file type is invalid, file is corrupted, or empty
         """
         try:
-            logger.info(f"Parsing resume: {filename}")
+            logger.info("Parsing resume: %s", filename)
             
             # Validate file type
             file_ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
@@ -254,13 +254,13 @@ class ResumeParser:
             # Add filename to result
             result['file_name'] = filename
             
-            logger.info(f"Resume parsed successfully: {filename}")
+            logger.info("Resume parsed successfully: %s", filename)
             return result
             
         except ValueError as e:
-            logger.error(f"Validation error: {str(e)}")
+            logger.error("Validation error: %s", e)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error parsing resume: {str(e)}")
+            logger.error("Unexpected error parsing resume: %s", e)
             raise ValueError(f"Failed to parse resume file: {str(e)}")
 
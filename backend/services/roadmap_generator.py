@@ -1,14 +1,14 @@
 """
 Roadmap generation service for creating career roadmaps.
 """
-from services.ai_service import AIService
+from services.ai_service import get_ai_service
 from utils.prompt_templates import PromptTemplates
 
 class RoadmapGenerator:
     """Generate structured career roadmaps using AI."""
     
     def __init__(self):
-        self.ai_service = AIService()
+        self.ai_service = get_ai_service()
         self.prompt_templates = PromptTemplates()
     
     def generate(self, domain, time_commitment, resume_data):
@@ -0,0 +1,196 @@
+"""
+Tests for AIService behaviour around the OpenRouter API, with the API faked.
+"""
+import os
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import httpx
+from openai import APIConnectionError, APIStatusError, AuthenticationError, RateLimitError
+
+os.environ.setdefault('OPENROUTER_API_KEY', 'test-key')
+
+from services import ai_service  # noqa: E402
+from services.ai_service import AIService, RateLimitExceeded  # noqa: E402
+from utils.rate_limiter import TokenBucket  # noqa: E402
+
+REQUEST = httpx.Request('POST', 'https://openrouter.ai/api/v1/chat/completions')
+
+
+def completion(text):
+    """Build a minimal chat completion carrying text."""
+    message = SimpleNamespace(content=text)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason='stop')], usage=None)
+
+
+def status_error(error_class, status, headers=None):
+    """Build an OpenAI client error for an HTTP status."""
+    response = httpx.Response(status, headers=headers, request=REQUEST)
+    return error_class('HTTP %d' % status, response=response, body=None)
+
+
+class RetryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.service = AIService()
+        self.create = mock.Mock()
+        self.service._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=self.create)))
+        for patcher in (
+            mock.patch.object(ai_service, '_request_bucket', TokenBucket(rate=1000, capacity=1000)),
+            mock.patch.object(ai_service.random, 'uniform', return_value=0.0),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(ai_service.time, 'sleep')
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def delays(self):
+        return [call.args[0] for call in self.sleep.call_args_list]
+
+    def test_transient_error_is_retried(self):
+        self.create.side_effect = [status_error(APIStatusError, 502), completion('ok')]
+        self.assertEqual(self.service._call_openrouter_api('prompt'), 'ok')
+        self.assertEqual(self.create.call_count, 2)
+        self.assertEqual(self.delays(), [AIService.RETRY_BASE_DELAY])
+
+    def test_backoff_doubles_until_attempts_run_out(self):
+        self.create.side_effect = APIConnectionError(request=REQUEST)
+        with self.assertRaises(ValueError):
+            self.service._call_openrouter_api('prompt')
+        self.assertEqual(self.create.call_count, AIService.MAX_ATTEMPTS)
+        self.assertEqual(self.delays(), [AIService.RETRY_BASE_DELAY * 2 ** i for i in range(AIService.MAX_ATTEMPTS - 1)])
+
+    def test_rate_limit_waits_at_least_retry_after(self):
+        self.create.side_effect = status_error(RateLimitError, 429, {'retry-after': '9'})
+        with self.assertRaises(RateLimitExceeded) as raised:
+            self.service._call_openrouter_api('prompt')
+        self.assertTrue(all(delay >= 9 for delay in self.delays()))
+        self.assertEqual(raised.exception.retry_after, 9)
+
+    def test_fatal_error_is_not_retried(self):
+        self.create.side_effect = status_error(AuthenticationError, 401)
+        with self.assertRaisesRegex(ValueError, 'Invalid API key'):
+            self.service._call_openrouter_api('prompt')
+        self.assertEqual(self.create.call_count, 1)
+        self.sleep.assert_not_called()
+
+    def test_client_error_is_not_retried(self):
+        self.create.side_effect = status_error(APIStatusError, 404)
+        with self.assertRaises(ValueError):
+            self.service._call_openrouter_api('prompt')
+        self.assertEqual(self.create.call_count, 1)
+
+    def test_retries_stop_at_the_deadline(self):
+        self.create.side_effect = status_error(APIStatusError, 503)
+        with mock.patch.object(AIService, 'RETRY_DEADLINE', 1.0):
+            with self.assertRaises(ValueError):
+                self.service._call_openrouter_api('prompt')
+        self.assertEqual(self.create.call_count, 1)
+
+    def test_busy_call_slots_raise_rate_limit(self):
+        slots = ai_service.threading.BoundedSemaphore(1)
+        slots.acquire()
+        with mock.patch.object(ai_service, '_api_slots', slots), \
+                mock.patch.object(AIService, 'SLOT_WAIT_TIMEOUT', 0.01):
+            with self.assertRaises(RateLimitExceeded):
+                self.service._call_openrouter_api('prompt')
+        self.create.assert_not_called()
+
+
+class RoadmapSectionRepairTest(unittest.TestCase):
+
+    def setUp(self):
+        self.service = AIService()
+        self.system = ai_service.ROADMAP_PLAN_SECTION
+        self.prompt = 'Section repair profile %s' % self.id()
+        self.cache_key = self.service._roadmap_section_cache_key(self.system, self.prompt)
+
+    def test_only_missing_keys_are_requested_and_merged(self):
+        replies = [
+            '{"total_duration_weeks": 12, "phases": [{"phase_number": 1}]}',
+            '{"weekly_schedule": [{"week": 1}], "phases": "ignored"}',
+        ]
+        with mock.patch.object(AIService, '_call_openrouter_api', side_effect=replies) as api:
+            section = self.service._run_roadmap_section(self.system, self.prompt, self.cache_key)
+
+        self.assertIn('missing these keys: weekly_schedule', api.call_args_list[1].args[0])
+        self.assertEqual(section, {'total_duration_weeks': 12, 'phases': [{'phase_number': 1}],
+                                   'weekly_schedule': [{'week': 1}]})
+        self.assertEqual(self.service._get_cached_response(self.cache_key), section)
+
+    def test_complete_section_makes_one_call(self):
+        reply = '{"total_duration_weeks": 4, "phases": [], "weekly_schedule": []}'
+        with mock.patch.object(AIService, '_call_openrouter_api', return_value=reply) as api:
+            self.service._run_roadmap_section(self.system, self.prompt, self.cache_key)
+        self.assertEqual(api.call_count, 1)
+
+    def test_failed_repair_returns_partial_section_uncached(self):
+        replies = ['{"total_duration_weeks": 12, "phases": []}', TimeoutError('timed out')]
+        with mock.patch.object(AIService, '_call_openrouter_api', side_effect=replies):
+            section = self.service._run_roadmap_section(self.system, self.prompt, self.cache_key)
+
+        self.assertEqual(section, {'total_duration_weeks': 12, 'phases': []})
+        self.assertIsNone(self.service._get_cached_response(self.cache_key))
+
+    def test_gaps_left_after_repair_get_defaults_in_the_roadmap(self):
+        roadmap = self.service._complete_roadmap({'total_duration_weeks': 12, 'phases': []})
+        self.assertEqual(roadmap['weekly_schedule'], [])
+        self.assertEqual(roadmap['career_insights'], '')
+        self.assertEqual(roadmap['skill_gap_analysis'],
+                         {'strengths': [], 'gaps': [], 'challenges': [], 'strategies': []})
+
+
+class ResumeAnalysisFallbackTest(unittest.TestCase):
+
+    def setUp(self):
+        self.service = AIService()
+        self.resume = 'Backend developer with 4 years of Python, Django and Docker.'
+
+    def test_outage_falls_back_to_offline_extraction(self):
+        with mock.patch.object(AIService, '_call_openrouter_api', side_effect=TimeoutError('timed out')):
+            profile = self.service.analyze_resume(self.resume)
+
+        self.assertTrue(profile['degraded'])
+        self.assertEqual(profile['skills'], ['Python', 'Django', 'Docker'])
+        self.assertEqual(profile['years_of_experience'], 4)
+
+    def test_rate_limit_is_raised_not_degraded(self):
+        with mock.patch.object(AIService, '_call_openrouter_api', side_effect=RateLimitExceeded('slow down', 7)):
+            with self.assertRaises(RateLimitExceeded) as raised:
+                self.service.analyze_resume(self.resume)
+        self.assertEqual(raised.exception.retry_after, 7)
+
+
+class RecommendationPrefetchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.service = AIService()
+        self.profile = {'skills': ['Python'], 'experience_level': 'Junior'}
+
+    def test_disabled_by_default(self):
+        self.assertFalse(AIService.PREFETCH_RECOMMENDATIONS)
+        with mock.patch.object(self.service._prefetch_executor, 'submit') as submit:
+            self.service.prefetch_domain_recommendations(self.profile)
+        submit.assert_not_called()
+
+    def test_skipped_without_spare_rate_limit(self):
+        drained = TokenBucket(rate=1 / 3.0, capacity=5)
+        drained.acquire(5)
+        with mock.patch.object(AIService, 'PREFETCH_RECOMMENDATIONS', True), \
+                mock.patch.object(ai_service, '_request_bucket', drained), \
+                mock.patch.object(self.service._prefetch_executor, 'submit') as submit:
+            self.service.prefetch_domain_recommendations(self.profile)
+        submit.assert_not_called()
+
+    def test_runs_when_enabled_with_spare_capacity(self):
+        with mock.patch.object(AIService, 'PREFETCH_RECOMMENDATIONS', True), \
+                mock.patch.object(ai_service, '_request_bucket', TokenBucket(rate=1, capacity=5)), \
+                mock.patch.object(self.service._prefetch_executor, 'submit') as submit:
+            self.service.prefetch_domain_recommendations(self.profile)
+        submit.assert_called_once_with(self.service.recommend_domains, self.profile)
+
+
+if __name__ == '__main__':
+    unittest.main()
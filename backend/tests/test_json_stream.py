@@ -0,0 +1,71 @@
+"""
+Tests for incremental JSON array parsing of streamed model output.
+"""
+import json
+import random
+import unittest
+
+from utils.json_stream import JsonArrayStream
+
+ITEMS = [
+    {'domain': 'Cloud', 'reason': 'Uses "AWS" daily', 'key_tools': ['Terraform', 'K8s']},
+    {'domain': 'Data {Eng}', 'reason': 'Escaped \\ backslash and ] bracket', 'key_tools': []},
+    {'domain': 'Security', 'reason': 'Nested {"a": [1, {"b": 2}]}', 'key_tools': [{'name': 'Vault'}]},
+]
+DOCUMENT = '```json\n' + json.dumps({'recommendations': ITEMS, 'note': 'done'}, indent=2) + '\n```'
+
+
+def feed_in_chunks(text, sizes):
+    """Feed text through a stream in chunks of the given sizes; collect items per chunk."""
+    stream = JsonArrayStream('recommendations')
+    items = []
+    position = 0
+    for size in sizes:
+        items.extend(stream.feed(text[position:position + size]))
+        position += size
+    items.extend(stream.feed(text[position:]))
+    return stream, items
+
+
+class JsonArrayStreamTest(unittest.TestCase):
+
+    def test_whole_document_in_one_chunk(self):
+        stream, items = feed_in_chunks(DOCUMENT, [])
+        self.assertEqual(items, ITEMS)
+        self.assertEqual(stream.text, DOCUMENT)
+
+    def test_one_character_chunks(self):
+        _, items = feed_in_chunks(DOCUMENT, [1] * len(DOCUMENT))
+        self.assertEqual(items, ITEMS)
+
+    def test_random_chunk_boundaries(self):
+        rng = random.Random(1234)
+        for _ in range(200):
+            sizes = [rng.randint(1, 12) for _ in range(len(DOCUMENT))]
+            _, items = feed_in_chunks(DOCUMENT, sizes)
+            self.assertEqual(items, ITEMS)
+
+    def test_items_are_emitted_as_soon_as_they_close(self):
+        stream = JsonArrayStream('recommendations')
+        self.assertEqual(stream.feed('{"recommendations": [{"domain": "Cl'), [])
+        self.assertEqual(stream.feed('oud"}, {"domain"'), [{'domain': 'Cloud'}])
+        self.assertEqual(stream.feed(': "AI"}]}'), [{'domain': 'AI'}])
+
+    def test_key_split_across_chunks(self):
+        stream = JsonArrayStream('recommendations')
+        self.assertEqual(stream.feed('{"recommend'), [])
+        self.assertEqual(stream.feed('ations" :\n ['), [])
+        self.assertEqual(stream.feed('{"a": 1}]'), [{'a': 1}])
+
+    def test_text_after_the_array_is_ignored(self):
+        stream = JsonArrayStream('recommendations')
+        stream.feed('{"recommendations": [{"a": 1}], "other": [{"b": 2}]}')
+        self.assertEqual(stream.feed('{"c": 3}'), [])
+
+    def test_non_object_elements_are_skipped(self):
+        _, items = feed_in_chunks('{"recommendations": [1, "two", {"a": 3}, [4]]}', [5, 7, 3])
+        self.assertEqual(items, [{'a': 3}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Tests for the AI response cache tiers.
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from utils import response_cache
+from utils.response_cache import ResponseCache, SqliteResponseCache, _Compressed
+
+
+class ResponseCacheTest(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        cache = ResponseCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')  # 'b' is now least recently used
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(len(cache), 2)
+
+    def test_entries_expire_after_ttl(self):
+        clock = [1000.0]
+        with mock.patch.object(response_cache.time, 'monotonic', side_effect=lambda: clock[0]):
+            cache = ResponseCache(maxsize=8, ttl=10)
+            cache.set('a', 'value')
+            clock[0] += 9
+            self.assertEqual(cache.get('a'), 'value')
+            clock[0] += 2
+            self.assertIsNone(cache.get('a'))
+            self.assertNotIn('a', cache)
+
+            # The next write purges the expired entry
+            cache.set('b', 'other')
+            self.assertEqual(len(cache), 1)
+
+    def test_overwrite_keeps_the_new_expiry(self):
+        clock = [0.0]
+        with mock.patch.object(response_cache.time, 'monotonic', side_effect=lambda: clock[0]):
+            cache = ResponseCache(maxsize=8, ttl=10)
+            cache.set('a', 1)
+            clock[0] += 8
+            cache.set('a', 2)
+            clock[0] += 8  # Past the first expiry, before the second
+            cache.set('b', 3)
+            self.assertEqual(cache.get('a'), 2)
+
+    def test_expiry_heap_stays_bounded_under_overwrites(self):
+        cache = ResponseCache(maxsize=4, ttl=60)
+        for i in range(1000):
+            cache.set('a', i)
+        self.assertLessEqual(len(cache._expiry), 2 * 4 + 1)
+
+    def test_values_over_the_size_limit_are_not_cached(self):
+        cache = ResponseCache(maxsize=8, ttl=60, max_value_bytes=16)
+        self.assertFalse(cache.set('big', 'x' * 100))
+        self.assertIsNone(cache.get('big'))
+        self.assertTrue(cache.set('small', 'x'))
+
+    def test_large_values_are_compressed_and_round_trip(self):
+        cache = ResponseCache(maxsize=8, ttl=60, compress_min_bytes=64)
+        value = {'phases': [{'title': 'Phase %d' % i, 'weeks': i} for i in range(50)]}
+        cache.set('roadmap', value)
+
+        self.assertIsInstance(cache._data['roadmap'][0], _Compressed)
+        self.assertEqual(cache.get('roadmap'), value)
+
+        cache.set('small', {'a': 1})
+        self.assertNotIsInstance(cache._data['small'][0], _Compressed)
+
+    def test_hits_are_independent_copies(self):
+        cache = ResponseCache(maxsize=8, ttl=60)
+        cache.set('a', {'weeks': 4})
+        hit = cache.get('a')
+        hit['estimated_completion_date'] = '2030-01-01'
+
+        self.assertEqual(cache.get('a'), {'weeks': 4})
+
+    def test_get_many_returns_only_hits(self):
+        cache = ResponseCache(maxsize=8, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get_many(['a', 'missing', 'b']), {'a': 1, 'b': 2})
+
+
+class SqliteResponseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def test_values_persist_across_instances(self):
+        SqliteResponseCache(self.path).set('a', {'skills': ['Python']})
+        self.assertEqual(SqliteResponseCache(self.path).get('a'), {'skills': ['Python']})
+
+    def test_expired_rows_are_misses(self):
+        cache = SqliteResponseCache(self.path, ttl=-1)
+        cache.set('a', 1)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get_many(['a']), {})
+
+    def test_get_many_spans_query_chunks(self):
+        cache = SqliteResponseCache(self.path)
+        cache.MAX_KEYS_PER_QUERY = 2
+        for i in range(5):
+            cache.set('k%d' % i, i)
+        found = cache.get_many(['k%d' % i for i in range(6)])
+        self.assertEqual(found, {'k%d' % i: i for i in range(5)})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,278 @@
+"""
+Tests for the API routes through the Flask test client, with the OpenRouter API faked.
+"""
+import io
+import os
+import unittest
+from unittest import mock
+
+import orjson
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.test import EnvironBuilder
+
+os.environ.setdefault('OPENROUTER_API_KEY', 'test-key')
+
+from app import app  # noqa: E402
+from api.routes import MAX_JSON_BYTES, MAX_UPLOAD_BYTES  # noqa: E402
+from utils.file_handler import FileHandler  # noqa: E402
+from services import ai_service  # noqa: E402
+from services.ai_service import AIService, RateLimitExceeded  # noqa: E402
+
+RECOMMENDATIONS = {'recommendations': [
+    {'domain': 'Cloud', 'reason': 'Builds on Docker', 'difficulty': 'Medium', 'market_demand': 'High',
+     'key_tools': ['AWS']},
+]}
+
+
+def sse_events(response):
+    """Split a Server-Sent Events body into (event name, payload) pairs."""
+    events = []
+    for block in response.get_data(as_text=True).split('\n\n'):
+        if not block:
+            continue
+        event = 'message'
+        for line in block.split('\n'):
+            if line.startswith('event: '):
+                event = line[len('event: '):]
+            elif line.startswith('data: '):
+                events.append((event, orjson.loads(line[len('data: '):])))
+    return events
+
+
+class RouteTestCase(unittest.TestCase):
+    """Base case with a test client and the model calls replaced by mocks."""
+
+    def setUp(self):
+        self.client = app.test_client()
+        patcher = mock.patch.object(AIService, '_call_openrouter_api')
+        self.api = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(AIService, '_stream_openrouter_api')
+        self.stream_api = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def stream_chunks(self, text, size=7):
+        """Make the streaming model call yield text in fixed-size chunks."""
+        self.stream_api.side_effect = lambda *a, **k: iter([text[i:i + size] for i in range(0, len(text), size)])
+
+
+class RecommendDomainsTest(RouteTestCase):
+
+    def test_repeat_profile_is_served_from_the_service_cache(self):
+        self.api.return_value = orjson.dumps(RECOMMENDATIONS).decode()
+        profile = {'skills': ['Docker', 'Go'], 'experience_level': 'Mid-Level', 'years_of_experience': 3}
+
+        first = self.client.post('/api/recommend-domains', json={'profile': profile})
+        second = self.client.post('/api/recommend-domains', json={'profile': profile})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.get_json()['recommendations'], first.get_json()['recommendations'])
+        self.assertEqual(self.api.call_count, 1)
+
+    def test_stream_sends_each_recommendation_then_done(self):
+        items = RECOMMENDATIONS['recommendations'] + [
+            {'domain': 'Data {Eng}', 'reason': 'Knows "SQL"', 'difficulty': 'Hard', 'market_demand': 'High',
+             'key_tools': ['Spark']},
+        ]
+        self.stream_chunks('```json\n' + orjson.dumps({'recommendations': items}).decode() + '\n```')
+        profile = {'skills': ['SQL', 'Python'], 'experience_level': 'Junior', 'years_of_experience': 1}
+
+        response = self.client.post('/api/recommend-domains/stream', json={'profile': profile})
+
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        events = sse_events(response)
+        self.assertEqual(events[:-1], [('message', {'recommendation': item}) for item in items])
+        self.assertEqual(events[-1][0], 'done')
+        self.assertEqual(len(events[-1][1]['recommendations']), 2)
+
+
+ROADMAP_SECTIONS = {
+    ai_service.ROADMAP_PLAN_SECTION: {'total_duration_weeks': 8, 'phases': [{'phase_number': 1}],
+                                      'weekly_schedule': [{'week': 1}]},
+    ai_service.ROADMAP_RESOURCES_SECTION: {'resources': [{'title': 'Docs'}]},
+    ai_service.ROADMAP_INSIGHTS_SECTION: {'projects': [], 'career_insights': 'Keep going',
+                                          'skill_gap_analysis': {'strengths': [], 'gaps': [],
+                                                                 'challenges': [], 'strategies': []}},
+}
+
+
+class RoadmapStreamTest(RouteTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.api.side_effect = lambda prompt, *a, system=None, **k: orjson.dumps(ROADMAP_SECTIONS[system]).decode()
+
+    def request_body(self, skill):
+        return {'profile': {'skills': [skill], 'experience_level': 'Junior', 'years_of_experience': 1},
+                'selected_tools': ['Kubernetes'], 'hours_per_week': 8}
+
+    def test_sections_then_merged_roadmap(self):
+        response = self.client.post('/api/generate-roadmap/stream', json=self.request_body('Haskell'))
+
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        events = sse_events(response)
+        sections = [payload['section'] for event, payload in events[:-1]]
+        self.assertCountEqual(sections, list(ROADMAP_SECTIONS.values()))
+
+        event, payload = events[-1]
+        self.assertEqual(event, 'done')
+        roadmap = payload['roadmap']
+        for section in ROADMAP_SECTIONS.values():
+            self.assertEqual({key: roadmap[key] for key in section}, section)
+        self.assertIn('estimated_completion_date', roadmap)
+
+    def test_cached_roadmap_is_sent_as_done_only(self):
+        body = self.request_body('Clojure')
+        self.client.post('/api/generate-roadmap', json=body)
+        calls = self.api.call_count
+
+        events = sse_events(self.client.post('/api/generate-roadmap/stream', json=body))
+
+        self.assertEqual([event for event, _ in events], ['done'])
+        self.assertEqual(self.api.call_count, calls)
+
+    def test_rate_limit_is_an_error_event(self):
+        self.api.side_effect = RateLimitExceeded('API rate limit exceeded.', retry_after=4)
+        events = sse_events(self.client.post('/api/generate-roadmap/stream', json=self.request_body('OCaml')))
+
+        event, payload = events[-1]
+        self.assertEqual(event, 'error')
+        self.assertEqual(payload['error'], 'RATE_LIMITED')
+        self.assertEqual(payload['retry_after'], 4)
+
+
+class ChatStreamTest(RouteTestCase):
+
+    def test_deltas_then_cleaned_reply(self):
+        self.stream_chunks('```\nStart with Docker basics. Then try Compose.\n```', size=5)
+        response = self.client.post('/api/chat/stream', json={'message': 'Where should I start with containers?'})
+
+        events = sse_events(response)
+        deltas = ''.join(payload['delta'] for event, payload in events[:-1])
+        self.assertIn('Start with Docker basics.', deltas)
+        self.assertEqual(events[-1], ('done', {'response': 'Start with Docker basics. Then try Compose.'}))
+
+    def test_exchange_is_recorded_for_the_next_message(self):
+        self.stream_chunks('Learn Linux first. It pays off later.')
+        sse_events(self.client.post('/api/chat/stream', json={'message': 'What comes before DevOps?'}))
+
+        self.api.return_value = 'Then learn networking.'
+        self.client.post('/api/chat', json={'message': 'And after that?'})
+
+        prompt = self.api.call_args.args[0]
+        self.assertIn('User: What comes before DevOps?\nAssistant: Learn Linux first.', prompt)
+
+    def test_api_error_is_an_error_event(self):
+        self.stream_api.side_effect = ValueError('API error: bad gateway')
+        events = sse_events(self.client.post('/api/chat/stream', json={'message': 'Will this fail?'}))
+        self.assertEqual(events[-1][0], 'error')
+        self.assertEqual(events[-1][1]['error'], 'CHAT_ERROR')
+
+
+class RateLimitResponseTest(RouteTestCase):
+    """Rate-limited AI calls answer 503 with Retry-After instead of an error body."""
+
+    def setUp(self):
+        super().setUp()
+        self.api.side_effect = RateLimitExceeded('API rate limit exceeded.', retry_after=7)
+
+    def assert_rate_limited(self, response):
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '7')
+        self.assertEqual(response.get_json()['error'], 'RATE_LIMITED')
+
+    def test_analyze_resume(self):
+        self.assert_rate_limited(self.client.post('/api/analyze-resume', json={
+            'resume_text': 'Rate limited resume: Go developer with 2 years of Kubernetes.'}))
+
+    def test_recommend_domains(self):
+        self.assert_rate_limited(self.client.post('/api/recommend-domains', json={
+            'profile': {'skills': ['Rust'], 'experience_level': 'Senior', 'years_of_experience': 9}}))
+
+    def test_generate_roadmap(self):
+        self.assert_rate_limited(self.client.post('/api/generate-roadmap', json={
+            'profile': {'skills': ['Elixir'], 'experience_level': 'Junior'},
+            'selected_tools': ['Phoenix'], 'hours_per_week': 6}))
+
+    def test_chat(self):
+        self.assert_rate_limited(self.client.post('/api/chat', json={'message': 'Rate limited question?'}))
+
+
+class UploadSizeTest(RouteTestCase):
+
+    def upload(self, size, **kwargs):
+        return self.client.post('/api/upload-resume', data={'file': (io.BytesIO(b'a' * size), 'resume.txt')}, **kwargs)
+
+    def test_declared_length_over_the_limit_is_413(self):
+        response = self.upload(MAX_UPLOAD_BYTES + 1)
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.get_json()['error'], 'FILE_SIZE_ERROR')
+
+    def test_body_without_length_is_cut_off_at_the_limit(self):
+        builder = EnvironBuilder(path='/api/upload-resume', method='POST',
+                                 data={'file': (io.BytesIO(b'a' * (MAX_UPLOAD_BYTES + 1)), 'resume.txt')})
+        environ = builder.get_environ()
+        del environ['CONTENT_LENGTH']
+        environ['wsgi.input_terminated'] = True
+
+        response = self.client.open(environ)
+
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.get_json()['error'], 'FILE_SIZE_ERROR')
+
+    def test_file_over_the_limit_within_the_body_limit_is_measured(self):
+        response = self.upload(FileHandler.MAX_FILE_SIZE + 1)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['error'], 'FILE_SIZE_ERROR')
+
+    def test_file_at_the_limit_is_accepted(self):
+        response = self.upload(1024)
+        self.assertEqual(response.status_code, 200)
+
+    def test_app_handler_answers_413_as_json(self):
+        with app.test_request_context('/api/chat', method='POST'):
+            response = app.make_response(app.handle_http_exception(RequestEntityTooLarge()))
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.get_json()['error'], 'PAYLOAD_TOO_LARGE')
+
+
+class JsonSizeTest(RouteTestCase):
+
+    def test_oversized_json_body_is_rejected_before_the_model_is_called(self):
+        body = orjson.dumps({'message': 'a' * MAX_JSON_BYTES, 'session_id': 'oversized'})
+        response = self.client.post('/api/chat', data=body, content_type='application/json')
+
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.get_json()['error'], 'PAYLOAD_TOO_LARGE')
+        self.api.assert_not_called()
+
+
+class CorsPreflightTest(RouteTestCase):
+
+    def preflight(self, method='POST', headers='Content-Type', origin='http://localhost:5173'):
+        request_headers = {'Origin': origin, 'Access-Control-Request-Method': method}
+        if headers:
+            request_headers['Access-Control-Request-Headers'] = headers
+        return self.client.options('/api/chat', headers=request_headers)
+
+    def test_allowed_preflight_is_answered(self):
+        response = self.preflight(headers='content-type, Authorization')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Access-Control-Allow-Origin'], 'http://localhost:5173')
+        self.assertIn('POST', response.headers['Access-Control-Allow-Methods'])
+
+    def test_disallowed_method_is_not_granted(self):
+        response = self.preflight(method='DELETE')
+        self.assertNotIn('Access-Control-Allow-Methods', response.headers)
+
+    def test_disallowed_header_is_not_granted(self):
+        response = self.preflight(headers='X-Custom')
+        self.assertNotIn('Access-Control-Allow-Headers', response.headers)
+
+    def test_unknown_origin_is_not_granted(self):
+        response = self.preflight(origin='https://evil.example')
+        self.assertNotIn('Access-Control-Allow-Origin', response.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
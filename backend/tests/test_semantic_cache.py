@@ -0,0 +1,135 @@
+"""
+Tests for the semantic cache and the places AIService relies on it.
+"""
+import os
+import unittest
+from unittest import mock
+
+from utils.semantic_cache import SemanticCache, cosine_similarity, text_vector
+
+os.environ.setdefault('OPENROUTER_API_KEY', 'test-key')
+
+from services.ai_service import AIService  # noqa: E402
+
+
+class SemanticCacheTest(unittest.TestCase):
+
+    def test_near_duplicates_hit(self):
+        cache = SemanticCache(threshold=0.9)
+        cache.set('python, django, postgresql, docker', 'value')
+        self.assertEqual(cache.get('Python, Django, PostgreSQL, Docker.'), 'value')
+
+    def test_unrelated_text_misses(self):
+        cache = SemanticCache(threshold=0.9)
+        cache.set('python, django, postgresql, docker', 'value')
+        self.assertIsNone(cache.get('figma, illustrator, photoshop'))
+
+    def test_scopes_are_isolated(self):
+        cache = SemanticCache()
+        cache.set('python, django', 'value', scope='a')
+        self.assertIsNone(cache.get('python, django', scope='b'))
+        self.assertEqual(cache.get('python, django', scope='a'), 'value')
+
+    def test_entries_expire(self):
+        cache = SemanticCache(ttl=-1)
+        cache.set('python, django', 'value')
+        self.assertIsNone(cache.get('python, django'))
+
+    def test_oldest_entry_is_evicted(self):
+        cache = SemanticCache(maxsize=1)
+        cache.set('python, django', 'old')
+        cache.set('figma, photoshop', 'new')
+        self.assertIsNone(cache.get('python, django'))
+        self.assertEqual(cache.get('figma, photoshop'), 'new')
+
+    def test_questions_differing_in_one_number_look_identical(self):
+        # Why chat replies are never served from the semantic cache
+        pairs = [
+            ('Which resources do you recommend for the Docker and Kubernetes topics in week 3 of my roadmap?',
+             'Which resources do you recommend for the Docker and Kubernetes topics in week 4 of my roadmap?'),
+            ('Should I learn Kubernetes before Terraform for my backend roadmap?',
+             'Should I not learn Kubernetes before Terraform for my backend roadmap?'),
+        ]
+        for a, b in pairs:
+            score = cosine_similarity(text_vector(a), text_vector(b))
+            self.assertGreaterEqual(score, AIService.SEMANTIC_CACHE_THRESHOLD)
+
+
+class ChatCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.service = AIService()
+        self.service.persistent_cache = None
+        self.context = {'profile': {'skills': ['Python']}, 'roadmap_summary': 'Backend roadmap', 'history': []}
+
+    def test_chat_does_not_reuse_answers_for_similar_questions(self):
+        replies = iter(['Week 3 covers APIs.', 'Week 4 covers testing.'])
+        question = 'Which resources do you recommend for the Docker and Kubernetes topics in week %d of my roadmap?'
+        with mock.patch.object(AIService, '_call_openrouter_api', side_effect=lambda *a, **k: next(replies)) as api:
+            first = self.service.chat_assistant(question % 3, self.context)
+            second = self.service.chat_assistant(question % 4, self.context)
+
+        self.assertEqual(api.call_count, 2)
+        self.assertEqual(first, 'Week 3 covers APIs.')
+        self.assertEqual(second, 'Week 4 covers testing.')
+
+    def test_chat_reuses_answers_for_the_same_question(self):
+        with mock.patch.object(AIService, '_call_openrouter_api', return_value='Week 3 covers APIs.') as api:
+            self.service.chat_assistant('What do I learn in week 3?', self.context)
+            self.service.chat_assistant('What do I learn in week 3?', self.context)
+        self.assertEqual(api.call_count, 1)
+
+
+class RecommendationSimilarityTest(unittest.TestCase):
+
+    def test_near_duplicate_profile_reuses_recommendations(self):
+        service = AIService()
+        service.persistent_cache = None
+        profile = {'skills': ['Python', 'Django', 'PostgreSQL', 'Docker', 'Redis', 'Celery', 'AWS'],
+                   'experience_level': 'Mid-Level', 'years_of_experience': 4,
+                   'current_role': 'Backend Developer', 'domains': ['Web Development']}
+        reply = '{"recommendations": [{"domain": "Cloud", "reason": "AWS", "difficulty": "Medium", ' \
+                '"market_demand": "High", "key_tools": ["Terraform"]}]}'
+        with mock.patch.object(AIService, '_call_openrouter_api', return_value=reply) as api:
+            first = service.recommend_domains(profile)
+            second = service.recommend_domains(dict(profile, current_role='Backend Developer II'))
+
+        self.assertEqual(api.call_count, 1)
+        self.assertEqual(second, first)
+
+
+class RoadmapSimilarityKeyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.service = AIService()
+
+    def _roadmap_request(self, **profile):
+        profile = {'skills': ['Python', 'Django', 'Docker'], 'experience_level': 'Junior',
+                   'years_of_experience': 1, **profile}
+        return {'profile': profile, 'selected_tools': ['Kubernetes'], 'hours_per_week': 10}
+
+    def test_roadmap_scope_depends_on_seniority(self):
+        base_text, base_scope = self.service._roadmap_similarity_key(self._roadmap_request())
+        _, other_years = self.service._roadmap_similarity_key(self._roadmap_request(years_of_experience=8))
+        _, other_level = self.service._roadmap_similarity_key(self._roadmap_request(experience_level='Senior'))
+
+        self.assertNotEqual(base_scope, other_years)
+        self.assertNotEqual(base_scope, other_level)
+        self.assertEqual(base_text, 'django, docker, python')
+
+    def test_roadmap_for_other_years_is_not_reused(self):
+        cache = self.service.semantic_cache
+        skills_text, scope = self.service._roadmap_similarity_key(self._roadmap_request())
+        cache.set(skills_text, 'junior roadmap', scope=scope)
+        # The skill text alone is an exact match; only the scope keeps them apart
+        self.assertIsNone(cache.get(*self.service._roadmap_similarity_key(self._roadmap_request(years_of_experience=8))))
+        self.assertEqual(cache.get(*self.service._roadmap_similarity_key(self._roadmap_request())), 'junior roadmap')
+
+    def test_roadmap_scope_ignores_skill_order(self):
+        first = self.service._roadmap_similarity_key(self._roadmap_request())
+        second = self.service._roadmap_similarity_key(self._roadmap_request(skills=['docker', 'Python', 'Django']))
+        self.assertEqual(first, second)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Tests for session storage and chat history.
+"""
+import threading
+import unittest
+
+from utils.session_store import ChatHistory, ShardedSessionStore, format_exchange
+
+
+class ShardedSessionStoreTest(unittest.TestCase):
+
+    def test_get_set_and_contains(self):
+        store = ShardedSessionStore()
+        store.set('session', {'text': 'resume'})
+        self.assertIn('session', store)
+        self.assertEqual(store.get('session'), {'text': 'resume'})
+        self.assertNotIn('missing', store)
+        self.assertEqual(store.get('missing', 'default'), 'default')
+
+    def test_get_or_create_builds_once_across_threads(self):
+        store = ShardedSessionStore()
+        built = []
+
+        def factory():
+            built.append(1)
+            return []
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(store.get_or_create('session', factory)))
+                   for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(built), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_evicts_least_recently_used_within_a_shard(self):
+        store = ShardedSessionStore(maxsize=2, shards=1)
+        store.set('a', 1)
+        store.set('b', 2)
+        store.get('a')
+        store.set('c', 3)
+
+        self.assertIn('a', store)
+        self.assertNotIn('b', store)
+        self.assertEqual(store.get('c'), 3)
+
+    def test_capacity_is_split_across_shards(self):
+        store = ShardedSessionStore(maxsize=64, shards=4)
+        for i in range(1000):
+            store.set('session-%d' % i, i)
+        self.assertLessEqual(sum(1 for i in range(1000) if 'session-%d' % i in store), 64)
+
+
+class FormatExchangeTest(unittest.TestCase):
+
+    def test_reply_is_cut_to_its_first_sentence(self):
+        exchange = format_exchange('What next?', 'Learn Docker. Then move on to Kubernetes.')
+        self.assertEqual(exchange, 'User: What next?\nAssistant: Learn Docker.')
+
+    def test_long_messages_are_capped(self):
+        exchange = format_exchange('q' * 1000, 'a' * 1000)
+        user, assistant = exchange.split('\n')
+        self.assertEqual(len(user), len('User: ') + 300)
+        self.assertEqual(len(assistant), len('Assistant: ') + 300)
+
+
+class ChatHistoryTest(unittest.TestCase):
+
+    def test_keeps_only_the_newest_exchanges(self):
+        history = ChatHistory(maxlen=3)
+        for i in range(5):
+            history.add('q%d' % i, 'a%d.' % i)
+
+        self.assertEqual(len(history), 3)
+        self.assertEqual(history.recent(2), ['User: q3\nAssistant: a3.', 'User: q4\nAssistant: a4.'])
+        self.assertEqual(len(history.recent(10)), 3)
+
+    def test_recent_is_a_snapshot(self):
+        history = ChatHistory()
+        history.add('q', 'a.')
+        recent = history.recent(5)
+        history.add('q2', 'a2.')
+        self.assertEqual(len(recent), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Tests for SingleFlight deduplication of concurrent calls.
+"""
+import threading
+import unittest
+
+from utils.single_flight import SingleFlight
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def _run_concurrently(self, flight, fn, callers):
+        """Start callers that all join the same key while fn is blocked; collect results or errors."""
+        outcomes = [None] * callers
+        threads = []
+
+        def call(index):
+            try:
+                outcomes[index] = ('ok', flight.do('key', fn, timeout=5))
+            except Exception as e:
+                outcomes[index] = ('error', e)
+
+        for index in range(callers):
+            thread = threading.Thread(target=call, args=(index,))
+            thread.start()
+            threads.append(thread)
+        return threads, outcomes
+
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def work():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return 'result'
+
+        threads, outcomes = self._run_concurrently(flight, work, 1)
+        started.wait(5)
+        more, more_outcomes = self._run_concurrently(flight, work, 3)
+        # Give the followers a moment to join the in-flight call
+        threading.Event().wait(0.1)
+        release.set()
+        for thread in threads + more:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(outcomes + more_outcomes, [('ok', 'result')] * 4)
+
+    def test_leader_exception_reaches_followers(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def work():
+            started.set()
+            release.wait(5)
+            raise ValueError('upstream failed')
+
+        threads, outcomes = self._run_concurrently(flight, work, 1)
+        started.wait(5)
+        more, more_outcomes = self._run_concurrently(flight, work, 2)
+        threading.Event().wait(0.1)
+        release.set()
+        for thread in threads + more:
+            thread.join(5)
+
+        for kind, error in outcomes + more_outcomes:
+            self.assertEqual(kind, 'error')
+            self.assertIsInstance(error, ValueError)
+            self.assertEqual(str(error), 'upstream failed')
+
+    def test_key_is_released_after_failure(self):
+        flight = SingleFlight()
+
+        def fail():
+            raise ValueError('boom')
+
+        with self.assertRaises(ValueError):
+            flight.do('key', fail)
+        self.assertEqual(flight.do('key', lambda: 'retried'), 'retried')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+"""
+Tests for the offline resume skill extractor.
+"""
+import unittest
+
+from utils.skill_extractor import SkillExtractor
+
+
+class SkillExtractorTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.extractor = SkillExtractor()
+
+    def test_skills_in_order_of_first_mention(self):
+        skills = self.extractor.extract_skills('Built APIs in python and Docker; more Python later.')
+        self.assertEqual(skills, ['Python', 'Docker'])
+
+    def test_names_inside_longer_names_are_not_matched(self):
+        self.assertEqual(self.extractor.extract_skills('Frontend work in JavaScript'), ['JavaScript'])
+
+    def test_short_names_must_match_case(self):
+        self.assertEqual(self.extractor.extract_skills('I go to work and write C'), ['C'])
+
+    def test_largest_years_mention_sets_level(self):
+        profile = self.extractor.analyze('3 years at Acme, 6+ yrs total with Python')
+        self.assertEqual(profile['years_of_experience'], 6)
+        self.assertEqual(profile['experience_level'], 'Senior')
+        self.assertTrue(profile['degraded'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Incremental parsing of JSON arrays from streamed model output.
+"""
+import re
+import orjson
+
+
+class JsonArrayStream:
+    """
+    Pull complete objects out of a JSON array as the text arrives.
+
+    Text is fed in arbitrary chunks; each call to feed returns the objects of
+    the array stored under a given key that became complete in that chunk,
+    e.g. the recommendations of {"recommendations": [{...}, {...}]}. Only
+    object elements are yielded.
+    """
+
+    def __init__(self, key):
+        """
+        Args:
+            key: Name of the object key whose array value is streamed
+        """
+        self._start = re.compile(r'"' + re.escape(key) + r'"\s*:\s*\[')
+        self._chunks = []
+        self._buffer = ''
+        self._pos = None  # Scan position inside the array, None until it is found
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._item_start = None
+        self._closed = False
+
+    @property
+    def text(self):
+        """All text fed so far."""
+        return ''.join(self._chunks)
+
+    def feed(self, chunk):
+        """
+        Add a chunk of text.
+
+        Args:
+            chunk: Next piece of the streamed response
+
+        Returns:
+            list: Objects from the array completed by this chunk
+        """
+        self._chunks.append(chunk)
+        self._buffer += chunk
+        if self._closed:
+            return []
+
+        if self._pos is None:
+            match = self._start.search(self._buffer)
+            if not match:
+                return []
+            self._pos = match.end()
+
+        items = []
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            char = buffer[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                if self._depth == 0 and char == '{':
+                    self._item_start = i
+                self._depth += 1
+            elif char in '}]':
+                if self._depth == 0:
+                    # End of the streamed array
+                    self._closed = True
+                    break
+                self._depth -= 1
+                if self._depth == 0 and self._item_start is not None:
+                    try:
+                        items.append(orjson.loads(buffer[self._item_start:i + 1]))
+                    except orjson.JSONDecodeError:
+                        pass
+                    self._item_start = None
+
+        # Drop scanned text that no pending element needs
+        keep_from = self._item_start if self._item_start is not None else len(buffer)
+        self._buffer = buffer[keep_from:]
+        if self._item_start is not None:
+            self._item_start = 0
+        self._pos = len(self._buffer)
+        return items
@@ -0,0 +1,70 @@
+"""
+Client-side rate limiting for outbound API calls.
+"""
+import time
+import threading
+
+
+class TokenBucket:
+    """Token bucket that paces callers to a steady request rate with small bursts."""
+
+    def __init__(self, rate, capacity=5):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens held, i.e. the largest allowed burst
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        """Add the tokens accrued since the last refill (caller holds the lock)."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def available(self):
+        """
+        Get the tokens that could be taken right now without waiting.
+
+        Returns:
+            float: Tokens currently in the bucket (negative while in debt)
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            return self.tokens
+
+    def _reserve(self, tokens):
+        """
+        Take tokens from the bucket, going into debt if it is empty.
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            float: Seconds the caller must wait before its tokens are available
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self, tokens=1):
+        """
+        Block until the requested tokens are available.
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        delay = self._reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
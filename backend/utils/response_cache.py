@@ -0,0 +1,340 @@
+"""
+Caches for AI responses: a bounded in-memory tier and optional persistent
+tiers shared across workers (Redis or a local SQLite file).
+"""
+import time
+import zlib
+import heapq
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+import orjson
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache whose entries also expire after a fixed TTL.
+
+    Values are stored as serialized JSON and decoded on every hit, so callers
+    each get their own copy and can modify it without changing the entry.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300, max_value_bytes=None, compress_min_bytes=None):
+        """
+        Args:
+            maxsize: Maximum number of entries (least recently used evicted first)
+            ttl: Seconds an entry stays valid after it is stored
+            max_value_bytes: Optional limit on a value's serialized size; larger
+                values are not cached
+            compress_min_bytes: Optional serialized size from which values are
+                stored zlib-compressed
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_value_bytes = max_value_bytes
+        self.compress_min_bytes = compress_min_bytes
+        self._data = OrderedDict()  # key -> (value, expires_at)
+        self._expiry = []  # heap of (expires_at, key); stale pairs are skipped lazily
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        """
+        Get a cached value if present and not expired.
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+
+        Returns:
+            Cached value, or default if missing or expired
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            # Expired entries are left for the expiry heap to purge on the next set
+            if entry is None or entry[1] <= time.monotonic():
+                return default
+            self._data.move_to_end(key)
+            value = entry[0]
+        if isinstance(value, _Compressed):
+            return orjson.loads(zlib.decompress(value.data))
+        return orjson.loads(value)
+
+    def get_many(self, keys):
+        """
+        Get several cached values at once.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            dict: key -> value for the keys that were present and not expired
+        """
+        found = {}
+        for key in keys:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                found[key] = value
+        return found
+
+    def set(self, key, value):
+        """
+        Store a value, evicting the least recently used entry if full.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value to store
+
+        Returns:
+            bool: False if the value was too large to cache, True otherwise
+        """
+        value = orjson.dumps(value, default=str)
+        if self.max_value_bytes is not None and len(value) > self.max_value_bytes:
+            return False
+        if self.compress_min_bytes is not None and len(value) >= self.compress_min_bytes:
+            # JSON compresses several-fold even at the fastest level
+            value = _Compressed(zlib.compress(value, 1))
+
+        with self._lock:
+            now = time.monotonic()
+            self._purge_expired(now)
+            expires_at = now + self.ttl
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            heapq.heappush(self._expiry, (expires_at, key))
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            if len(self._expiry) > 2 * self.maxsize:
+                # Mostly stale pairs from overwritten or evicted keys; rebuild from live entries
+                self._expiry = [(entry[1], k) for k, entry in self._data.items()]
+                heapq.heapify(self._expiry)
+        return True
+
+    def _purge_expired(self, now):
+        """
+        Drop entries whose TTL has passed, in expiry order.
+
+        Only heap pairs that have actually expired are visited, so the cost is
+        proportional to the number of expirations rather than the cache size.
+        Must be called with the lock held.
+        """
+        expiry = self._expiry
+        while expiry and expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(expiry)
+            entry = self._data.get(key)
+            # Skip pairs left behind by a key that was since overwritten
+            if entry is not None and entry[1] == expires_at:
+                del self._data[key]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+
+class _Compressed:
+    """Marker for a value stored as zlib-compressed JSON."""
+
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+
+class RedisResponseCache:
+    """
+    Shared, persistent cache tier backed by Redis.
+
+    Survives worker restarts and is shared across gunicorn workers. Redis
+    errors are logged and treated as cache misses so a Redis outage never
+    fails a request.
+    """
+
+    def __init__(self, url, ttl=86400, namespace='skillsync'):
+        """
+        Args:
+            url: Redis connection URL
+            ttl: Seconds entries are kept
+            namespace: Prefix for all keys written by this cache
+
+        Raises:
+            ImportError: If the redis package is not installed
+        """
+        import redis
+
+        self.ttl = ttl
+        self.namespace = namespace
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._errors = (redis.RedisError,)
+
+    def _key(self, key):
+        return f"{self.namespace}:{key}"
+
+    def get(self, key, default=None):
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss or Redis error
+
+        Returns:
+            Cached value, or default
+        """
+        try:
+            raw = self._client.get(self._key(key))
+        except self._errors as e:
+            logger.warning("Redis cache read failed: %s", e)
+            return default
+        return orjson.loads(raw) if raw is not None else default
+
+    def get_many(self, keys):
+        """
+        Get several cached values in one MGET round trip.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            dict: key -> value for the keys found; empty on a Redis error
+        """
+        keys = list(keys)
+        if not keys:
+            return {}
+        try:
+            raws = self._client.mget([self._key(key) for key in keys])
+        except self._errors as e:
+            logger.warning("Redis cache read failed: %s", e)
+            return {}
+        return {key: orjson.loads(raw) for key, raw in zip(keys, raws) if raw is not None}
+
+    def set(self, key, value):
+        """
+        Store a JSON-serializable value with the tier's TTL.
+
+        Args:
+            key: Cache key
+            value: Value to store
+
+        Returns:
+            bool: True if the value was written
+        """
+        try:
+            self._client.setex(self._key(key), self.ttl, orjson.dumps(value))
+        except self._errors as e:
+            logger.warning("Redis cache write failed: %s", e)
+            return False
+        return True
+
+
+class SqliteResponseCache:
+    """
+    Persistent cache tier stored in a local SQLite file.
+
+    Survives restarts and is shared by every worker process on the host,
+    without running a separate service. Expiry uses wall-clock time since
+    entries outlive the process that wrote them. SQLite errors are logged
+    and treated as cache misses.
+    """
+
+    PRUNE_EVERY = 256  # Writes between sweeps of expired rows
+    MAX_KEYS_PER_QUERY = 500  # Stays under SQLite's bound-parameter limit
+
+    def __init__(self, path, ttl=86400):
+        """
+        Args:
+            path: Database file path (created if missing)
+            ttl: Seconds entries are kept
+        """
+        self.ttl = ttl
+        self._conn = sqlite3.connect(path, timeout=1.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses '
+            '(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)'
+        )
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def get(self, key, default=None):
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss, expiry or SQLite error
+
+        Returns:
+            Cached value, or default
+        """
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    'SELECT value FROM responses WHERE key = ? AND expires_at > ?',
+                    (key, time.time())
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("SQLite cache read failed: %s", e)
+            return default
+        return orjson.loads(row[0]) if row is not None else default
+
+    def get_many(self, keys):
+        """
+        Get several cached values with one query per MAX_KEYS_PER_QUERY keys.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            dict: key -> value for the keys found; empty on a SQLite error
+        """
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        now = time.time()
+        try:
+            with self._lock:
+                for start in range(0, len(keys), self.MAX_KEYS_PER_QUERY):
+                    chunk = keys[start:start + self.MAX_KEYS_PER_QUERY]
+                    rows = self._conn.execute(
+                        f'SELECT key, value FROM responses WHERE key IN ({", ".join("?" * len(chunk))}) '
+                        'AND expires_at > ?',
+                        (*chunk, now)
+                    ).fetchall()
+                    found.update(rows)
+        except sqlite3.Error as e:
+            logger.warning("SQLite cache read failed: %s", e)
+            return {}
+        return {key: orjson.loads(raw) for key, raw in found.items()}
+
+    def set(self, key, value):
+        """
+        Store a JSON-serializable value with the tier's TTL.
+
+        Args:
+            key: Cache key
+            value: Value to store
+
+        Returns:
+            bool: True if the value was written
+        """
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)',
+                    (key, orjson.dumps(value), now + self.ttl)
+                )
+                self._writes += 1
+                if self._writes % self.PRUNE_EVERY == 0:
+                    self._conn.execute('DELETE FROM responses WHERE expires_at <= ?', (now,))
+        except sqlite3.Error as e:
+            logger.warning("SQLite cache write failed: %s", e)
+            return False
+        return True
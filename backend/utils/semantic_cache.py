@@ -0,0 +1,106 @@
+"""
+Similarity-based cache for AI responses to near-duplicate inputs.
+"""
+import re
+import math
+import time
+import threading
+from collections import Counter, deque
+
+_NON_WORD = re.compile(r'[^a-z0-9+#]+')
+
+
+def text_vector(text):
+    """
+    Build a character-trigram vector for a piece of text.
+
+    Case, punctuation and spacing are ignored, so small edits and typos
+    still produce vectors close to the original.
+
+    Args:
+        text: Text to vectorize
+
+    Returns:
+        tuple: (Counter of trigrams, vector norm)
+    """
+    normalized = ' ' + _NON_WORD.sub(' ', text.lower()).strip() + ' '
+    grams = Counter(normalized[i:i + 3] for i in range(len(normalized) - 2))
+    norm = math.sqrt(sum(count * count for count in grams.values()))
+    return grams, norm
+
+
+def cosine_similarity(a, b):
+    """
+    Cosine similarity between two vectors from text_vector.
+
+    Args:
+        a: (Counter, norm) tuple
+        b: (Counter, norm) tuple
+
+    Returns:
+        float: Similarity between 0.0 and 1.0
+    """
+    grams_a, norm_a = a
+    grams_b, norm_b = b
+    if not norm_a or not norm_b:
+        return 0.0
+    if len(grams_a) > len(grams_b):
+        grams_a, grams_b = grams_b, grams_a
+    dot = sum(count * grams_b.get(gram, 0) for gram, count in grams_a.items())
+    return dot / (norm_a * norm_b)
+
+
+class SemanticCache:
+    """Bounded FIFO cache that matches lookups by text similarity instead of exact keys."""
+
+    def __init__(self, maxsize=2048, threshold=0.95, ttl=300):
+        """
+        Args:
+            maxsize: Maximum number of entries (oldest evicted first)
+            threshold: Minimum cosine similarity for a lookup to count as a hit
+            ttl: Seconds an entry stays valid after it is stored
+        """
+        self.threshold = threshold
+        self.ttl = ttl
+        self._entries = deque(maxlen=maxsize)  # (scope, vector, value, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, text, scope=None):
+        """
+        Find the cached value for the most similar stored text.
+
+        Args:
+            text: Lookup text
+            scope: Only entries stored with the same scope are considered
+
+        Returns:
+            Cached value of the best match above the threshold, or None
+        """
+        vector = text_vector(text)
+        now = time.monotonic()
+        best_value, best_score = None, self.threshold
+
+        with self._lock:
+            entries = list(self._entries)
+
+        for entry_scope, entry_vector, value, expires_at in entries:
+            if entry_scope != scope or expires_at <= now:
+                continue
+            score = cosine_similarity(vector, entry_vector)
+            if score >= best_score:
+                best_value, best_score = value, score
+
+        return best_value
+
+    def set(self, text, value, scope=None):
+        """
+        Store a value for a piece of text.
+
+        Args:
+            text: Text the value was produced from
+            value: Value to cache
+            scope: Scope the entry can be matched within
+        """
+        entry = (scope, text_vector(text), value, time.monotonic() + self.ttl)
+        with self._lock:
+            self._entries.append(entry)
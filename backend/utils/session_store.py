@@ -0,0 +1,174 @@
+"""
+Thread-safe in-memory storage for per-session data and other keyed results.
+"""
+import re
+import threading
+from itertools import islice
+from collections import OrderedDict, deque
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+EXCHANGE_MESSAGE_MAX_CHARS = 300  # Per side of an exchange kept in prompt history
+
+
+def format_exchange(user_message, assistant_message):
+    """
+    Format one chat exchange for the prompt history.
+
+    The user's message is kept (up to EXCHANGE_MESSAGE_MAX_CHARS); the reply
+    is cut to its first sentence, which is usually enough to remind the model
+    what it said without resending every earlier answer in full.
+
+    Args:
+        user_message: Message sent by the user
+        assistant_message: Reply returned to the user
+
+    Returns:
+        str: Exchange formatted as "User: ...\nAssistant: ..."
+    """
+    first_sentence = _SENTENCE_END.split(assistant_message.strip(), maxsplit=1)[0]
+    return (f"User: {user_message[:EXCHANGE_MESSAGE_MAX_CHARS]}\n"
+            f"Assistant: {first_sentence[:EXCHANGE_MESSAGE_MAX_CHARS]}")
+
+
+class ShardedSessionStore:
+    """Session-keyed LRU store split across independently locked shards."""
+
+    DEFAULT_SHARDS = 16
+
+    def __init__(self, maxsize=None, shards=DEFAULT_SHARDS):
+        # Round up to a power of two so the shard index is a cheap mask
+        shard_count = 1
+        while shard_count < max(1, shards):
+            shard_count <<= 1
+
+        self._mask = shard_count - 1
+        self._shards = [(OrderedDict(), threading.Lock()) for _ in range(shard_count)]
+
+        # Capacity is enforced per shard (least recently used evicted first)
+        self._shard_maxsize = -(-maxsize // shard_count) if maxsize else None
+
+    def _evict(self, data):
+        """Drop least recently used entries until the shard is within capacity."""
+        if self._shard_maxsize is None:
+            return
+        while len(data) > self._shard_maxsize:
+            data.popitem(last=False)
+
+    def _shard(self, session_id):
+        """
+        Get the (data, lock) shard that owns a session ID.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            tuple: (dict, threading.Lock) for the owning shard
+        """
+        return self._shards[hash(session_id) & self._mask]
+
+    def get(self, session_id, default=None):
+        """
+        Get the value stored for a session.
+
+        Args:
+            session_id: Session identifier
+            default: Value returned when the session has no entry
+
+        Returns:
+            Stored value, or default if missing
+        """
+        data, lock = self._shard(session_id)
+        with lock:
+            if session_id not in data:
+                return default
+            data.move_to_end(session_id)
+            return data[session_id]
+
+    def set(self, session_id, value):
+        """
+        Store a value for a session, replacing any previous value.
+
+        Args:
+            session_id: Session identifier
+            value: Value to store
+        """
+        data, lock = self._shard(session_id)
+        with lock:
+            data[session_id] = value
+            data.move_to_end(session_id)
+            self._evict(data)
+
+    def get_or_create(self, session_id, factory):
+        """
+        Get the value stored for a session, storing factory() first if missing.
+
+        Args:
+            session_id: Session identifier
+            factory: Zero-argument callable building the initial value
+
+        Returns:
+            Stored value
+        """
+        data, lock = self._shard(session_id)
+        with lock:
+            value = data.get(session_id)
+            if value is None:
+                value = data[session_id] = factory()
+            data.move_to_end(session_id)
+            self._evict(data)
+            return value
+
+    def __contains__(self, session_id):
+        data, lock = self._shard(session_id)
+        with lock:
+            return session_id in data
+
+
+class ChatHistory:
+    """
+    Bounded conversation history for one chat session.
+
+    Only each exchange pre-formatted for the chat prompt is kept, so building a
+    prompt never has to re-format the whole history and the raw messages are
+    not stored twice.
+    """
+
+    __slots__ = ('_exchanges', '_lock')
+
+    def __init__(self, maxlen=20):
+        """
+        Args:
+            maxlen: Maximum number of exchanges kept (oldest dropped first)
+        """
+        self._exchanges = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def add(self, user_message, assistant_message):
+        """
+        Record a completed exchange.
+
+        Args:
+            user_message: Message sent by the user
+            assistant_message: Reply returned to the user
+        """
+        exchange = format_exchange(user_message, assistant_message)
+        with self._lock:
+            self._exchanges.append(exchange)
+
+    def recent(self, count):
+        """
+        Get the most recent exchanges formatted for the chat prompt.
+
+        Args:
+            count: Maximum number of exchanges to return
+
+        Returns:
+            list: Up to count formatted exchanges, oldest first
+        """
+        with self._lock:
+            skip = max(0, len(self._exchanges) - count)
+            return list(islice(self._exchanges, skip, None))
+
+    def __len__(self):
+        return len(self._exchanges)
@@ -0,0 +1,71 @@
+"""
+Deduplication of concurrent identical work.
+"""
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Run one call per key at a time; concurrent callers with the same key share its result."""
+
+    def __init__(self):
+        self._calls = {}  # key -> Future of the in-flight call
+        self._lock = threading.Lock()
+
+    def _claim(self, key):
+        """
+        Join the in-flight call for a key, or register a new one.
+
+        Returns:
+            tuple: (Future, True if the caller must run the call itself)
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = self._calls[key] = Future()
+            return future, True
+
+    def _finish(self, key, future, result=None, error=None):
+        """Publish the leader's outcome to waiters and clear the key."""
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _shareable(self, error):
+        """Turn a cancellation or interrupt of the leader into an error waiters can handle."""
+        if isinstance(error, Exception):
+            return error
+        return RuntimeError("In-flight call was interrupted")
+
+    def do(self, key, fn, *args, timeout=None):
+        """
+        Run fn unless an identical call is already in flight, then share its result.
+
+        Args:
+            key: Key identifying identical calls
+            fn: Callable doing the work
+            *args: Arguments passed to fn
+            timeout: Seconds a waiting caller blocks for the leader's result
+
+        Returns:
+            Result of fn (from this call or the in-flight one)
+
+        Raises:
+            Whatever fn raised; concurrent.futures.TimeoutError if waiting timed out
+        """
+        future, leader = self._claim(key)
+        if not leader:
+            return future.result(timeout=timeout)
+
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            self._finish(key, future, error=self._shareable(e))
+            raise
+        self._finish(key, future, result=result)
+        return result
+
@@ -0,0 +1,95 @@
+"""
+Offline skill extraction used when AI resume analysis is unavailable.
+"""
+import os
+import re
+
+SKILLS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'skills.txt')
+
+_YEARS_PATTERN = re.compile(r'(\d{1,2})\s*\+?\s*(?:years?|yrs?)\b', re.IGNORECASE)
+
+
+class SkillExtractor:
+    """Match resume text against a skill dictionary with a single compiled regex."""
+
+    def __init__(self, skills_file=SKILLS_FILE):
+        """
+        Args:
+            skills_file: Path to a file with one skill per line ('#' starts a comment)
+        """
+        self._canonical = {}
+        with open(skills_file, encoding='utf-8') as f:
+            for line in f:
+                skill = line.strip()
+                if skill and not skill.startswith('#'):
+                    self._canonical.setdefault(skill.lower(), skill)
+
+        # Longest names first so 'React Native' wins over 'React'; the lookarounds
+        # stop 'C' matching inside 'CSS' or 'Java' inside 'JavaScript'
+        alternation = '|'.join(re.escape(skill) for skill in sorted(self._canonical, key=len, reverse=True))
+        self._pattern = re.compile(rf'(?<![\w+#.])(?:{alternation})(?![\w+#]|\.\w)', re.IGNORECASE)
+
+    def extract_skills(self, text):
+        """
+        Find dictionary skills mentioned in text.
+
+        Args:
+            text: Resume text
+
+        Returns:
+            list: Skill names in order of first mention, without duplicates
+        """
+        found = {}
+        for match in self._pattern.finditer(text):
+            skill = self._canonical[match.group(0).lower()]
+            # Very short names ('C', 'R', 'Go') must match exactly to skip ordinary words
+            if len(skill) <= 2 and match.group(0) != skill:
+                continue
+            found.setdefault(skill, None)
+        return list(found)
+
+    def estimate_years(self, text):
+        """
+        Take the largest 'N years' mention as total experience.
+
+        Args:
+            text: Resume text
+
+        Returns:
+            int: Years of experience, 0 if none mentioned
+        """
+        years = [int(value) for value in _YEARS_PATTERN.findall(text)]
+        return max(years, default=0)
+
+    def analyze(self, text):
+        """
+        Build a basic profile in the same shape as AI resume analysis.
+
+        Args:
+            text: Resume text
+
+        Returns:
+            dict: Profile with skills and experience, marked degraded=True
+        """
+        skills = self.extract_skills(text)
+        years = self.estimate_years(text)
+
+        if years == 0:
+            level = 'Unknown'
+        elif years < 2:
+            level = 'Junior'
+        elif years < 5:
+            level = 'Mid-Level'
+        else:
+            level = 'Senior'
+
+        return {
+            'skills': skills,
+            'years_of_experience': years,
+            'current_role': '',
+            'experience_level': level,
+            'domains': [],
+            'recent_tech': [],
+            'top_skills': skills[:5],
+            'degraded': True
+        }
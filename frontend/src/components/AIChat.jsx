@@ -48,7 +48,8 @@ function AIChat({ roadmap, profile }) {
     try {
       const context = {
         profile: profile || {},
-        roadmap_summary: roadmap ? JSON.stringify(roadmap).substring(0, 500) : '',
+        // The backend reduces the roadmap to a short summary for the prompt
+        roadmap_summary: roadmap || '',
       }
 
       const response = await chatWithAI(message, context)